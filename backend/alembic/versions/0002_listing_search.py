@@ -0,0 +1,81 @@
+"""Listing coordinates, row versions and search indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Same expressions as app.models.listing; queries must match them exactly to use the indexes
+SEARCH_DOCUMENT = (
+    "(setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A')"
+    " || setweight(to_tsvector('english'::regconfig, coalesce(amenities, '')), 'B'))"
+    " || setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')"
+)
+
+
+# name -> (columns or expressions, index method)
+INDEXES = {
+    "ix_listings_created_at_id": (["created_at", "id"], None),
+    "ix_listings_state_city_price": ([sa.text("lower(state)"), sa.text("lower(city)"), "price"], None),
+    "ix_listings_property_type_price": (["property_type", "price"], None),
+    "ix_listings_bedrooms_bathrooms_price": (["bedrooms", "bathrooms", "price"], None),
+    "ix_listings_availability": ([sa.text("tsrange(available_from, available_to, '[]')")], "gist"),
+    "ix_listings_location": ([sa.text("point(longitude, latitude)")], "gist"),
+    "ix_listings_search_document": ([sa.text(SEARCH_DOCUMENT)], "gin"),
+}
+
+
+def _invalid_indexes():
+    if context.is_offline_mode():
+        return []
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT index_class.relname FROM pg_index "
+            "JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid "
+            "WHERE pg_index.indrelid = 'listings'::regclass AND NOT pg_index.indisvalid "
+            "AND index_class.relname = ANY(:names)"
+        ),
+        {"names": list(INDEXES)},
+    ).scalars().all()
+
+
+def upgrade() -> None:
+    # Versions before migrations shipped these columns without adding them to
+    # existing tables, so a stamped database may or may not have them already
+    op.execute("ALTER TABLE listings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE")
+    op.execute("ALTER TABLE listings ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION")
+    op.execute("ALTER TABLE listings ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION")
+
+    # Listings were never validated before, and tsrange() raises on a reversed
+    # range, which would fail the availability index build part way through
+    op.execute(
+        "UPDATE listings SET available_from = available_to, available_to = available_from "
+        "WHERE available_from > available_to"
+    )
+
+    # Outside the transaction so listings stays writable while they build; see 0007
+    with op.get_context().autocommit_block():
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS
+        # would keep; drop it so it is built again
+        for name in _invalid_indexes():
+            op.drop_index(name, table_name="listings", postgresql_concurrently=True, if_exists=True)
+        for name, (columns, using) in INDEXES.items():
+            op.create_index(
+                name, "listings", columns, postgresql_using=using, postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in reversed(INDEXES):
+            op.drop_index(name, table_name="listings", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("listings", "longitude")
+    op.drop_column("listings", "latitude")
+    op.drop_column("listings", "updated_at")
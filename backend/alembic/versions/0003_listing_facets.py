@@ -0,0 +1,30 @@
+"""Listing facet counts
+
+Existing listings are counted with `python -m app.services.facets --rebuild`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listing_facet_counts",
+        sa.Column("facet", sa.String(), primary_key=True),
+        sa.Column("value", sa.String(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        # Created by the app itself before migrations existed
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("listing_facet_counts")
@@ -0,0 +1,63 @@
+"""Conversations inbox tables
+
+Existing message history is loaded with `python -m app.services.conversations --backfill`.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # last_message_id and last_read_message_id are not foreign keys; see 0006
+    op.create_table(
+        "conversations",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("listing_id", UUID(as_uuid=True), sa.ForeignKey("listings.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("participant_low_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("participant_high_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("last_message_id", UUID(as_uuid=True), nullable=True),
+        sa.Column("last_activity_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.UniqueConstraint(
+            "listing_id", "participant_low_id", "participant_high_id", name="uq_conversations_listing_participants"
+        ),
+        # Created by the app itself before migrations existed
+        if_not_exists=True,
+    )
+    op.create_table(
+        "conversation_participants",
+        sa.Column(
+            "conversation_id", UUID(as_uuid=True), sa.ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True
+        ),
+        sa.Column("user_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("counterpart_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("last_activity_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("last_read_message_id", UUID(as_uuid=True), nullable=True),
+        sa.Column("last_read_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        if_not_exists=True,
+    )
+    # The read watermark came after the table; a stamped database created
+    # between the two has the table without these columns (see 0005)
+    op.execute("ALTER TABLE conversation_participants ADD COLUMN IF NOT EXISTS last_read_message_id UUID")
+    op.execute("ALTER TABLE conversation_participants ADD COLUMN IF NOT EXISTS last_read_at TIMESTAMP WITH TIME ZONE")
+    op.execute("ALTER TABLE conversation_participants ADD COLUMN IF NOT EXISTS unread_count INTEGER DEFAULT 0 NOT NULL")
+    op.create_index(
+        "ix_conversation_participants_user_activity", "conversation_participants", ["user_id", "last_activity_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversation_participants_user_activity", table_name="conversation_participants")
+    op.drop_table("conversation_participants")
+    op.drop_table("conversations")
@@ -0,0 +1,27 @@
+"""Public key fingerprints and versions
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # May already exist on a stamped database; see 0002
+    op.execute("ALTER TABLE public_keys ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64)")
+    op.execute("ALTER TABLE public_keys ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1 NOT NULL")
+    op.execute("ALTER TABLE public_keys ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE")
+    # Same digest as app.models.public_key.key_fingerprint
+    op.execute("UPDATE public_keys SET fingerprint = encode(sha256(convert_to(public_key, 'UTF8')), 'hex')")
+
+
+def downgrade() -> None:
+    op.drop_column("public_keys", "updated_at")
+    op.drop_column("public_keys", "version")
+    op.drop_column("public_keys", "fingerprint")
@@ -0,0 +1,107 @@
+"""Partition messages by month on timestamp
+
+Rebuilds messages as a RANGE-partitioned table keyed on (id, timestamp) and
+copies the existing rows across. A table already converted with
+`python -m app.services.partitions --convert` is left as it is.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3  # the partition maintenance task keeps extending this
+MESSAGE_COLUMNS = "id, sender_id, receiver_id, listing_id, content, timestamp"
+MESSAGE_INDEXES = {
+    "ix_messages_conversation_timestamp": ["listing_id", "sender_id", "receiver_id", "timestamp", "id"],
+    "ix_messages_receiver_timestamp": ["receiver_id", "timestamp", "id"],
+    "ix_messages_sender_timestamp": ["sender_id", "timestamp", "id"],
+}
+
+
+# Kept in step with app.services.partitions by hand: the migration must not
+# change when that module does, but the partition names have to match
+def _month_start(value) -> date:
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"messages_y{month.year:04d}m{month.month:02d}"
+
+
+def _relkind(table: str):
+    return op.get_bind().execute(sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}).scalar()
+
+
+def _create_messages(partitioned: bool) -> None:
+    op.create_table(
+        "messages",
+        sa.Column("id", UUID(as_uuid=True), nullable=False),
+        sa.Column("sender_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("receiver_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("listing_id", UUID(as_uuid=True), sa.ForeignKey("listings.id"), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("timestamp", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "timestamp") if partitioned else sa.PrimaryKeyConstraint("id"),
+        **({"postgresql_partition_by": "RANGE (timestamp)"} if partitioned else {}),
+    )
+
+
+def upgrade() -> None:
+    if _relkind("messages") == "p":
+        return
+    # Databases created before migrations may still have these foreign keys
+    # (see 0004); they would follow the rename and block the drop below, and a
+    # partitioned table cannot be referenced on id alone anyway
+    op.execute("ALTER TABLE conversations DROP CONSTRAINT IF EXISTS conversations_last_message_id_fkey")
+    op.execute(
+        "ALTER TABLE conversation_participants "
+        "DROP CONSTRAINT IF EXISTS conversation_participants_last_read_message_id_fkey"
+    )
+    op.execute("ALTER TABLE messages RENAME TO messages_unpartitioned")
+    op.execute("ALTER TABLE messages_unpartitioned RENAME CONSTRAINT messages_pkey TO messages_unpartitioned_pkey")
+    for name in MESSAGE_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    _create_messages(partitioned=True)
+    for name, columns in MESSAGE_INDEXES.items():
+        op.create_index(name, "messages", columns)
+
+    first = op.get_bind().execute(sa.text("SELECT min(timestamp) FROM messages_unpartitioned")).scalar()
+    current = _month_start(datetime.now(timezone.utc))
+    month = _month_start(first) if first else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE {_partition_name(month)} PARTITION OF messages "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute(f"INSERT INTO messages ({MESSAGE_COLUMNS}) SELECT {MESSAGE_COLUMNS} FROM messages_unpartitioned")
+    op.drop_table("messages_unpartitioned")
+
+
+def downgrade() -> None:
+    # Archived months are not brought back; restore them first if they are needed
+    op.execute("ALTER TABLE messages RENAME TO messages_partitioned")
+    op.execute("ALTER TABLE messages_partitioned RENAME CONSTRAINT messages_pkey TO messages_partitioned_pkey")
+    for name in MESSAGE_INDEXES:
+        op.drop_index(name, table_name="messages_partitioned")
+    _create_messages(partitioned=False)
+    op.execute(f"INSERT INTO messages ({MESSAGE_COLUMNS}) SELECT {MESSAGE_COLUMNS} FROM messages_partitioned")
+    op.execute("DROP TABLE messages_partitioned CASCADE")
@@ -0,0 +1,43 @@
+"""Indexes on the foreign-key and filter columns the routers query by
+
+Built with CREATE INDEX CONCURRENTLY, outside the migration transaction, so
+the tables stay writable while they build. A build that fails part way leaves
+an INVALID index behind; drop it and re-run the upgrade.
+
+messages.sender_id, receiver_id and listing_id already lead the keyset
+indexes created in 0006, and CONCURRENTLY is not available on partitioned
+tables, so messages gets nothing new here.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+# name -> (table, columns)
+INDEXES = {
+    # GET /listings/my: a host's listings, newest first
+    "ix_listings_user_id_created_at": ("listings", ["user_id", "created_at", "id"]),
+    # Listing detail, image upload/delete and listing deletes load images by listing
+    "ix_listing_images_listing_id": ("listing_images", ["listing_id"]),
+    "ix_verification_tokens_user_id": ("verification_tokens", ["user_id"]),
+    # The primary key leads with user_id; deleting a listing cascades on listing_id
+    "ix_saved_listings_listing_id": ("saved_listings", ["listing_id"]),
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, columns) in INDEXES.items():
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, (table, _) in INDEXES.items():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
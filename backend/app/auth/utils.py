@@ -4,8 +4,8 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from ..core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.database import get_async_db
 from ..models.user import User
 from ..core.config import settings
 import uuid
@@ -30,7 +30,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 async def get_current_user(
     token: str = Depends(OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,7 +52,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_uuid).first()
+    user = await db.get(User, user_uuid)
     if user is None:
         raise credentials_exception
     return user 
\ No newline at end of file
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+
+class CacheBackend:
+    """
+    Minimal key/value cache interface. Routes only talk to this, so a shared
+    backend (e.g. Redis) can replace the in-process one without route changes.
+    """
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class InMemoryLRUCache(CacheBackend):
+    """
+    Thread-safe, size-bounded LRU cache whose entries also expire after a TTL
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# (ETag, encoded ListingResponse body) pairs keyed by canonical listing id. Writes to a
+# listing or its images invalidate explicitly; the TTL bounds staleness of the
+# embedded owner name/email, which are not tracked.
+listing_cache: CacheBackend = InMemoryLRUCache(
+    max_entries=settings.LISTING_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LISTING_CACHE_TTL_SECONDS,
+)
+
+# Listing ids invalidated within the replica lag bound. A replica read may
+# predate the invalidating write, so it must not repopulate listing_cache.
+listing_invalidations: CacheBackend = InMemoryLRUCache(
+    max_entries=settings.LISTING_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+)
+
+# Public key payloads keyed by user id. upload_public_key invalidates; the TTL
+# bounds staleness on other workers, whose caches it cannot reach.
+public_key_cache: CacheBackend = InMemoryLRUCache(
+    max_entries=settings.PUBLIC_KEY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PUBLIC_KEY_CACHE_TTL_SECONDS,
+)
+
+# User and listing ids written within DB_READ_YOUR_WRITES_SECONDS; reads about
+# them skip the replicas. In-process, so a write only pins reads served by the
+# same worker until a shared backend is plugged in here.
+recent_writes: CacheBackend = InMemoryLRUCache(
+    max_entries=settings.DB_READ_YOUR_WRITES_MAX_ENTRIES,
+    ttl_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 from dotenv import load_dotenv
 load_dotenv() 
 
@@ -24,6 +24,40 @@ class Settings(BaseSettings):
     FRONTEND_URL: str
     S3_BUCKET_NAME: str
     APP_ENV: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a connection before failing the request
+    DB_POOL_RECYCLE: int = 1800  # reconnect connections older than this, in seconds (-1 disables)
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_SLOW_CHECKOUT_MS: float = 100.0
+    DATABASE_REPLICA_URLS: str = ""  # comma-separated streaming replica URLs; GET routes read from these
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # replicas further behind than this are skipped
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 2.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 10.0  # reads about a user/listing stay on the primary this long after a write; keep above the max lag
+    DB_READ_YOUR_WRITES_MAX_ENTRIES: int = 100000
+    DB_QUERY_METRICS: bool = True  # per-statement timing hooks; adds SQLAlchemy event dispatch to every query
+    DB_SLOW_QUERY_MS: float = 200.0  # log statements slower than this, with parameter values redacted (0 disables)
+    DB_QUERY_COUNT_WARN: int = 50  # warn about requests issuing this many statements, usually an N+1 (0 disables)
+    GEOCODER: str = "local"  # "local" (offline city table) or "nominatim"
+    NOMINATIM_URL: str = "https://nominatim.openstreetmap.org"
+    LISTING_CACHE_MAX_ENTRIES: int = 2048
+    LISTING_CACHE_TTL_SECONDS: int = 60
+    PUBLIC_KEY_CACHE_MAX_ENTRIES: int = 10000
+    PUBLIC_KEY_CACHE_TTL_SECONDS: int = 300
+    PUBLIC_KEY_MAX_AGE_SECONDS: int = 31536000  # fingerprint-pinned key responses never change
+    REALTIME_BACKEND: str = "postgres"  # "postgres" (LISTEN/NOTIFY across workers) or "local" (single worker)
+    REALTIME_HEARTBEAT_SECONDS: int = 25
+    REALTIME_MAX_QUEUE: int = 256
+    REALTIME_RESUME_LIMIT: int = 500
+    MESSAGE_PARTITION_MONTHS_AHEAD: int = 3
+    MESSAGE_RETENTION_MONTHS: int = 24  # older monthly partitions are archived by the maintenance job
+    MESSAGE_ARCHIVE_DIR: str = "archives/messages"
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" (one object per line) or "text"
+    LOG_DEFAULT_SAMPLE_RATE: float = 1.0
+    # Fraction of DEBUG/INFO events kept per route, e.g. LOG_SAMPLE_RATES='{"create_message": 0.01}'
+    LOG_SAMPLE_RATES: Dict[str, float] = {"create_message": 0.1, "create_messages": 0.1}
+    LOG_PAYLOADS: bool = False  # dump request payloads at DEBUG; never enable in production
 
     class Config:
         env_file = ".env"
@@ -1,10 +1,28 @@
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import Request
+from jose import JWTError, jwt
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from app.core.cache import recent_writes
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.core.log import get_logger
+from app.core.pool import PoolMetrics, TimedAsyncQueuePool, TimedQueuePool, pool_options, pool_stats
+
+logger = get_logger(__name__)
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, poolclass=TimedQueuePool, **pool_options())
+engine.pool.metrics = PoolMetrics("sync")
+instrument_engine(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -14,4 +32,224 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+def async_database_url(url: str) -> URL:
+    """
+    The asyncpg flavour of a psycopg2-style DATABASE_URL. asyncpg spells
+    libpq's sslmode as ssl.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+        if "sslmode" in parsed.query:
+            query = dict(parsed.query)
+            query["ssl"] = query.pop("sslmode")
+            parsed = parsed.set(query=query)
+    elif parsed.get_backend_name() == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed
+
+# Used by async def routes so database round trips never block the event loop.
+# Sync def routes keep using SessionLocal, which FastAPI runs in its threadpool.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL), poolclass=TimedAsyncQueuePool, **pool_options()
+)
+async_engine.sync_engine.pool.metrics = PoolMetrics("async")
+instrument_engine(async_engine.sync_engine, "async")
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Seconds the replica is behind the primary. Zero when it has replayed
+# everything it received, so an idle primary does not read as lag.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Path and query parameters naming the user or listing a request is about
+SUBJECT_PARAMS = ("user_id", "user1_id", "user2_id", "listing_id")
+
+
+class Replica:
+    """
+    Sync and async engines for one streaming replica, plus its last measured
+    lag. The lag is refreshed by the monitor task, never on the request path.
+    """
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_engine(url, poolclass=TimedQueuePool, **pool_options())
+        self.engine.pool.metrics = PoolMetrics(f"{name}-sync")
+        instrument_engine(self.engine, f"{name}-sync")
+        self.async_engine = create_async_engine(
+            async_database_url(url), poolclass=TimedAsyncQueuePool, **pool_options()
+        )
+        self.async_engine.sync_engine.pool.metrics = PoolMetrics(f"{name}-async")
+        instrument_engine(self.async_engine.sync_engine, f"{name}-async")
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.AsyncSessionLocal = async_sessionmaker(self.async_engine, expire_on_commit=False, autoflush=False)
+        self.lag_seconds: Optional[float] = None  # None until measured, or while unreachable
+        self.checked_at = 0.0
+
+    def usable(self) -> bool:
+        # A monitor that stopped reporting is treated like a lagging replica
+        fresh = time.monotonic() - self.checked_at <= 3 * settings.DB_REPLICA_LAG_CHECK_SECONDS
+        return fresh and self.lag_seconds is not None and self.lag_seconds <= settings.DB_REPLICA_MAX_LAG_SECONDS
+
+    async def check_lag(self) -> None:
+        try:
+            async with self.async_engine.connect() as conn:
+                lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar())
+        except Exception as e:
+            if self.lag_seconds is not None:
+                logger.error("db_replica_unreachable", replica=self.name, error=str(e))
+            lag = None
+        else:
+            if lag > settings.DB_REPLICA_MAX_LAG_SECONDS:
+                logger.warning("db_replica_lagging", replica=self.name, lag_s=round(lag, 3))
+        self.lag_seconds = lag
+        self.checked_at = time.monotonic()
+
+    def status(self) -> dict:
+        return {"lag_seconds": self.lag_seconds, "usable": self.usable()}
+
+
+class ReplicaRouter:
+    """
+    Round-robins reads over the replicas that are within DB_REPLICA_MAX_LAG_SECONDS
+    of the primary. With none configured or none usable, reads use the primary.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(f"replica{index}", url) for index, url in enumerate(urls, start=1)]
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[Replica]:
+        usable = [replica for replica in self.replicas if replica.usable()]
+        if not usable:
+            return None
+        return usable[next(self._turn) % len(usable)]
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.gather(*(replica.check_lag() for replica in self.replicas))
+            await asyncio.sleep(settings.DB_REPLICA_LAG_CHECK_SECONDS)
+
+    async def start(self) -> None:
+        if self.replicas:
+            self._task = asyncio.ensure_future(self._monitor())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        for replica in self.replicas:
+            await replica.async_engine.dispose()
+            replica.engine.dispose()
+
+
+replica_router = ReplicaRouter([url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()])
+
+
+def all_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    pool_stats() for the primary and every replica engine, keyed by pool name
+    """
+    pools = {"sync": pool_stats(engine.pool), "async": pool_stats(async_engine.sync_engine.pool)}
+    for replica in replica_router.replicas:
+        pools[f"{replica.name}-sync"] = pool_stats(replica.engine.pool)
+        pools[f"{replica.name}-async"] = pool_stats(replica.async_engine.sync_engine.pool)
+    return pools
+
+
+def _normalize_id(value) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+
+def _token_subject(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+def request_subjects(request: Request) -> Set[str]:
+    """
+    Ids of the users and listings a request is about: its user/listing path and
+    query parameters plus the bearer token's user
+    """
+    values = [request.path_params.get(name) for name in SUBJECT_PARAMS]
+    values += [request.query_params.get(name) for name in SUBJECT_PARAMS]
+    values.append(_token_subject(request))
+    return {normalized for normalized in map(_normalize_id, filter(None, values)) if normalized}
+
+
+def record_writes(*ids) -> None:
+    """
+    Read-your-writes: reads about these users or listings use the primary for
+    the next DB_READ_YOUR_WRITES_SECONDS, so they never see a replica that is
+    behind the write. Routes whose body names other users call this directly.
+    """
+    if not replica_router.replicas:
+        return
+    for value in ids:
+        normalized = _normalize_id(value) if value is not None else None
+        if normalized:
+            recent_writes.set(normalized, True)
+
+
+def wants_primary(request: Request) -> bool:
+    return any(recent_writes.get(subject) is not None for subject in request_subjects(request))
+
+
+def _read_replica(request: Request) -> Optional[Replica]:
+    if not replica_router.replicas or wants_primary(request):
+        return None
+    return replica_router.choose()
+
+
+def get_read_db(request: Request):
+    """
+    Read-only session for GET routes: a replica when one is usable, else the primary.
+    session.info["replica"] names the replica, or is None on the primary.
+    """
+    replica = _read_replica(request)
+    db = replica.SessionLocal() if replica else SessionLocal()
+    db.info["replica"] = replica.name if replica else None
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    replica = _read_replica(request)
+    async with (replica.AsyncSessionLocal() if replica else AsyncSessionLocal()) as db:
+        db.info["replica"] = replica.name if replica else None
+        yield db
+
+
+async def record_request_writes(request: Request, call_next):
+    """
+    HTTP middleware: after a successful write, record the users and listings it
+    named (see request_subjects) for read-your-writes
+    """
+    response = await call_next(request)
+    if replica_router.replicas and request.method not in SAFE_METHODS and response.status_code < 400:
+        record_writes(*request_subjects(request))
+    return response
@@ -0,0 +1,38 @@
+import hashlib
+from typing import Iterable
+
+from fastapi import Request, Response
+
+
+def make_etag(parts: Iterable) -> str:
+    """
+    Build a strong ETag from the values that determine a response body
+    """
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    True if the request's If-None-Match header matches `etag`. If-None-Match
+    uses weak comparison, so a W/ prefix on the client's copy is ignored.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def set_etag(response: Response, etag: str, cache_control: str = "no-cache") -> None:
+    response.headers["ETag"] = etag
+    # By default allow caching but make clients revalidate every time
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str = "no-cache") -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag, cache_control)
+    return response
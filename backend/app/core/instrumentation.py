@@ -0,0 +1,150 @@
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import HistogramFamily
+
+logger = get_logger(__name__)
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+SLOW_QUERY_STATEMENT_CHARS = 2000
+
+REQUEST_SECONDS = HistogramFamily(
+    "http_request_duration_seconds", "Time to the response headers, per route", ("method", "route")
+)
+REQUEST_DB_SECONDS = HistogramFamily(
+    "http_request_db_seconds", "Time spent executing SQL per request, per route", ("method", "route")
+)
+REQUEST_QUERIES = HistogramFamily(
+    "http_request_db_queries", "SQL statements executed per request, per route", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+slow_queries = 0
+
+
+class RequestQueryStats:
+    """
+    SQL issued while serving one request: statement count, total execution
+    time and the slowest statement
+    """
+
+    __slots__ = ("count", "seconds", "slowest_seconds", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+# Set by the middleware; sync routes and threadpool work see it through the
+# context copy FastAPI makes, async sessions through SQLAlchemy's greenlets
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def redact_parameters(parameters: Any, executemany: bool) -> Any:
+    """
+    Parameter names and types without their values, which may be emails,
+    password hashes or message content
+    """
+    if executemany:
+        return {"rows": len(parameters)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # The execution context is per statement, so nothing leaks if it fails
+    context._query_start = time.perf_counter()
+
+
+def _log_slow_query(name: str, statement: str, parameters: Any, executemany: bool, seconds: float) -> None:
+    global slow_queries
+    slow_queries += 1
+    logger.warning(
+        "db_slow_query", engine=name, duration_ms=round(seconds * 1000, 1),
+        statement=statement[:SLOW_QUERY_STATEMENT_CHARS],
+        params=lambda: redact_parameters(parameters, executemany),
+    )
+
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Time every statement the engine executes, into the current request's stats
+    and the slow-query log. Takes a sync Engine; pass async_engine.sync_engine
+    for an AsyncEngine. Does nothing with DB_QUERY_METRICS off.
+    """
+    if not settings.DB_QUERY_METRICS:
+        return
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - context._query_start
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if settings.DB_SLOW_QUERY_MS > 0 and seconds * 1000 >= settings.DB_SLOW_QUERY_MS:
+            _log_slow_query(name, statement, parameters, executemany, seconds)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def _route_label(request: Request) -> str:
+    # The matched path template keeps the label set bounded
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+async def instrument_requests(request: Request, call_next):
+    """
+    HTTP middleware: per-route request time, DB time and query count
+    histograms, plus Server-Timing and X-DB-Queries headers in dev. Streaming
+    responses are measured up to their headers.
+    """
+    stats = RequestQueryStats()
+    token = _request_stats.set(stats)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _request_stats.reset(token)
+    elapsed = time.perf_counter() - start
+
+    labels = (request.method, _route_label(request))
+    REQUEST_SECONDS.labels(*labels).observe(elapsed)
+    REQUEST_DB_SECONDS.labels(*labels).observe(stats.seconds)
+    REQUEST_QUERIES.labels(*labels).observe(stats.count)
+    if settings.DB_QUERY_COUNT_WARN > 0 and stats.count >= settings.DB_QUERY_COUNT_WARN:
+        logger.warning(
+            "db_many_queries", method=labels[0], path=labels[1], queries=stats.count,
+            db_ms=round(stats.seconds * 1000, 1),
+        )
+
+    if settings.APP_ENV == "dev":
+        response.headers["Server-Timing"] = (
+            f"db;dur={stats.seconds * 1000:.1f};desc=\"{stats.count} queries\", app;dur={elapsed * 1000:.1f}"
+        )
+        response.headers["X-DB-Queries"] = str(stats.count)
+        if stats.slowest_statement is not None:
+            response.headers["X-DB-Slowest-Ms"] = f"{stats.slowest_seconds * 1000:.1f}"
+    logger.debug(
+        "request_db_stats", method=labels[0], path=labels[1], queries=stats.count,
+        db_ms=round(stats.seconds * 1000, 1), slowest_ms=round(stats.slowest_seconds * 1000, 1),
+        slowest=lambda: (stats.slowest_statement or "")[:SLOW_QUERY_STATEMENT_CHARS],
+    )
+    return response
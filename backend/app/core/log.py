@@ -0,0 +1,125 @@
+import logging
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+import orjson
+
+from .config import settings
+
+
+def _resolve(value: Any) -> Any:
+    # Callables are deferred values, only computed for records that are emitted
+    return value() if callable(value) else value
+
+
+def _record_fields(record: logging.LogRecord) -> dict:
+    return {key: _resolve(value) for key, value in getattr(record, "fields", {}).items()}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, event and the record's
+    structured fields. Fields are only serialized here, for emitted records.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+            **_record_fields(record),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str, option=orjson.OPT_UTC_Z).decode()
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Human-readable `event key=value ...` lines for local development
+    """
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        fields = _record_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def sample_rate(route: Optional[str]) -> float:
+    if route is None:
+        return 1.0
+    return settings.LOG_SAMPLE_RATES.get(route, settings.LOG_DEFAULT_SAMPLE_RATE)
+
+
+class StructuredLogger:
+    """
+    Thin wrapper over a stdlib logger for request-path logging. Each call is an
+    event name plus keyword fields; nothing is formatted unless the level is
+    enabled and, for DEBUG/INFO events tagged with a route, the event survives
+    that route's sampling rate. Warnings and errors are never sampled.
+    """
+
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(name)
+
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level: int, event: str, route: Optional[str] = None, exc_info: bool = False, **fields: Any) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if route is not None:
+            if level < logging.WARNING and random.random() >= sample_rate(route):
+                return
+            fields["route"] = route
+        self.logger.log(level, event, exc_info=exc_info, extra={"fields": fields}, stacklevel=3)
+
+    def debug(self, event: str, route: Optional[str] = None, **fields: Any) -> None:
+        self.log(logging.DEBUG, event, route, **fields)
+
+    def info(self, event: str, route: Optional[str] = None, **fields: Any) -> None:
+        self.log(logging.INFO, event, route, **fields)
+
+    def warning(self, event: str, route: Optional[str] = None, **fields: Any) -> None:
+        self.log(logging.WARNING, event, route, **fields)
+
+    def error(self, event: str, route: Optional[str] = None, **fields: Any) -> None:
+        self.log(logging.ERROR, event, route, **fields)
+
+    def exception(self, event: str, route: Optional[str] = None, **fields: Any) -> None:
+        self.log(logging.ERROR, event, route, exc_info=True, **fields)
+
+    def payload(self, event: str, data: Callable[[], Any], route: Optional[str] = None, **fields: Any) -> None:
+        """
+        Dump a request payload. Only active with LOG_PAYLOADS on and DEBUG
+        enabled; `data` is a callable so the dump costs nothing otherwise.
+        """
+        if settings.LOG_PAYLOADS:
+            self.log(logging.DEBUG, event, route, payload=data, **fields)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+def configure_logging(*names: str) -> None:
+    """
+    Route everything under the `app` package through one handler, at LOG_LEVEL.
+    Extra logger names are routed the same way; `python -m app.services.x`
+    CLIs pass "__main__", which is their module's logger name when run.
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+    for name in ("app", *names):
+        app_logger = logging.getLogger(name)
+        app_logger.handlers[:] = [handler]
+        app_logger.setLevel(settings.LOG_LEVEL.upper())
+        app_logger.propagate = False
@@ -0,0 +1,93 @@
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds in seconds, from sub-millisecond queries to pool timeouts
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram with fixed bucket upper bounds, in the
+    shape Prometheus expects: per-bucket counts plus total count and sum.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            running += count
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "count": running, "sum": total}
+
+
+class HistogramFamily:
+    """
+    One Histogram per label combination, e.g. per (method, route), created on
+    first observation. Label names are fixed when the family is declared.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        histogram = self._series.get(values)
+        if histogram is None:
+            with self._lock:
+                histogram = self._series.setdefault(values, Histogram(self.buckets))
+        return histogram
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted(self._series.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for values, histogram in series:
+            lines += render_histogram(self.name, dict(zip(self.label_names, values)), histogram.snapshot())
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def render_histogram(name: str, labels: Dict[str, str], snapshot: Dict) -> List[str]:
+    """
+    Prometheus text-format sample lines for one Histogram.snapshot()
+    """
+    lines = [
+        f"{name}_bucket{format_labels({**labels, 'le': _format_bound(bound)})} {count}"
+        for bound, count in snapshot["buckets"]
+    ]
+    lines.append(f"{name}_count{format_labels(labels)} {snapshot['count']}")
+    lines.append(f"{name}_sum{format_labels(labels)} {snapshot['sum']}")
+    return lines
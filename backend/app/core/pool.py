@@ -0,0 +1,106 @@
+import time
+from typing import Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.log import get_logger
+from app.core.metrics import Histogram
+
+logger = get_logger(__name__)
+
+
+def _overflow(pool) -> int:
+    # QueuePool counts overflow from -pool_size until the pool is full
+    return max(pool.overflow(), 0)
+
+
+class PoolMetrics:
+    """
+    Checkout timings and failures for one connection pool. The live gauges
+    (checked out, overflow, ...) are read from the pool itself in pool_stats().
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_seconds = Histogram()
+        self.slow_checkouts = 0
+        self.timeouts = 0
+
+    def observe_checkout(self, pool, seconds: float) -> None:
+        self.checkout_seconds.observe(seconds)
+        if seconds * 1000 >= settings.DB_POOL_SLOW_CHECKOUT_MS:
+            self.slow_checkouts += 1
+            logger.warning(
+                "db_pool_slow_checkout", pool=self.name, wait_ms=round(seconds * 1000, 1),
+                checked_out=pool.checkedout(), overflow=_overflow(pool), size=pool.size(),
+            )
+
+    def observe_timeout(self, pool) -> None:
+        self.timeouts += 1
+        logger.error(
+            "db_pool_timeout", pool=self.name, timeout_s=settings.DB_POOL_TIMEOUT,
+            checked_out=pool.checkedout(), overflow=_overflow(pool), size=pool.size(),
+        )
+
+
+class _TimedCheckoutMixin:
+    """
+    Times every checkout: the wait for a free connection plus pre-ping or
+    opening a new one. Timing Pool.connect keeps it to one observation per checkout.
+    """
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout(self)
+            raise
+        self.metrics.observe_checkout(self, time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Pools are rebuilt on dispose() and after invalidation; keep the counters
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options() -> Dict:
+    """
+    create_engine keyword arguments for the configured pool. Every engine gets
+    its own pool of this size.
+    """
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_stats(pool) -> Dict:
+    metrics = pool.metrics
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": _overflow(pool),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeouts": metrics.timeouts,
+        "slow_checkouts": metrics.slow_checkouts,
+        "checkout_seconds": metrics.checkout_seconds.snapshot(),
+    }
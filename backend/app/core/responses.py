@@ -0,0 +1,17 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson. Datetimes in UTC are written with a
+    trailing Z, matching Pydantic's output. Content that is already encoded
+    (bytes) is sent as-is, which lets cached bodies skip encoding entirely.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
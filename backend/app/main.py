@@ -5,14 +5,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute  # from save_listing
 
-from .routes import auth, listings, message, health, public_key, verification, saved_listings  # both routes
+from .routes import auth, listings, message, health, metrics, public_key, verification, saved_listings  # both routes
 
-from .core.database import engine, Base
+from .core.database import async_engine, replica_router, record_request_writes
+from .core.instrumentation import instrument_requests
+from .core.log import configure_logging
+from .services.realtime import start_realtime, stop_realtime
+from .services.partitions import start_partition_maintenance, stop_partition_maintenance
 
 
+configure_logging()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic migrations: run `alembic upgrade head` before starting
 
 app = FastAPI()
 
@@ -40,6 +44,24 @@ app.add_middleware(
     expose_headers=["*"],  # Expose all headers
 )
 
+# Read-your-writes for the replica-backed GET routes
+app.middleware("http")(record_request_writes)
+# Per-route request time, SQL time and query count; Server-Timing headers in dev
+app.middleware("http")(instrument_requests)
+
+@app.on_event("startup")
+async def startup():
+    await start_realtime()
+    await start_partition_maintenance()
+    await replica_router.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_realtime()
+    await stop_partition_maintenance()
+    await replica_router.stop()
+    await async_engine.dispose()
+
 # Include routers
 @app.options("/{full_path:path}")
 async def preflight(full_path: str, request: Request):
@@ -52,6 +74,7 @@ async def preflight(full_path: str, request: Request):
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(health.router, prefix="/api/v1/health", tags=["health"])
+app.include_router(metrics.router, tags=["metrics"])
 app.include_router(listings.router, prefix="/api/v1/listings", tags=["listings"])
 app.include_router(message.router, prefix="/api/v1/messages", tags=['messages'])
 app.include_router(public_key.router, prefix="/api/v1/keys", tags=["keys"])
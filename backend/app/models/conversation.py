@@ -0,0 +1,56 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, TIMESTAMP, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+import uuid
+from ..core.database import Base
+
+class Conversation(Base):
+    """
+    One conversation per listing and pair of users. The pair is stored in
+    sorted order so both directions of a chat map to the same row.
+    """
+    __tablename__ = "conversations"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    listing_id = Column(UUID(as_uuid=True), ForeignKey("listings.id", ondelete="CASCADE"), nullable=False)
+    participant_low_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    participant_high_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # Not a foreign key: messages is partitioned, so messages.id alone is not
+    # unique at the database level. Archived messages leave these dangling.
+    last_message_id = Column(UUID(as_uuid=True), nullable=True)
+    last_activity_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    last_message = relationship(
+        "Message", primaryjoin="foreign(Conversation.last_message_id) == Message.id", viewonly=True
+    )
+    participants = relationship("ConversationParticipant", back_populates="conversation", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        UniqueConstraint("listing_id", "participant_low_id", "participant_high_id", name="uq_conversations_listing_participants"),
+    )
+
+class ConversationParticipant(Base):
+    """
+    A user's side of a conversation. Carries the per-user state, including a
+    copy of last_activity_at so a user's inbox is one index range scan, and
+    the user's read watermark with the number of messages received after it.
+    """
+    __tablename__ = "conversation_participants"
+
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    counterpart_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    last_activity_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    last_read_message_id = Column(UUID(as_uuid=True), nullable=True)  # see Conversation.last_message_id
+    last_read_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    unread_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+
+    # Relationships
+    conversation = relationship("Conversation", back_populates="participants")
+
+    __table_args__ = (
+        Index("ix_conversation_participants_user_activity", "user_id", "last_activity_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, LargeBinary, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, LargeBinary, Text, Index, func, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -16,6 +16,34 @@ class PropertyType(str, enum.Enum):
     DUPLEX = "Duplex"
     ROOM = "Room"
 
+# Full-text search document over title, description and amenities. Listing
+# search must filter on this exact expression for Postgres to use the GIN
+# index on it; the index is maintained by Postgres on every insert/update.
+SEARCH_CONFIG = literal_column("'english'::regconfig")
+
+def _weighted(column, weight):
+    return func.setweight(
+        func.to_tsvector(SEARCH_CONFIG, func.coalesce(column, literal_column("''"))),
+        literal_column(f"'{weight}'")
+    )
+
+def search_document(title, amenities, description):
+    return (
+        _weighted(title, "A")
+        .op("||")(_weighted(amenities, "B"))
+        .op("||")(_weighted(description, "C"))
+    )
+
+# Closed availability interval of a listing, GiST-indexed for overlap (&&)
+# and containment (@>) queries
+def availability_range(available_from, available_to):
+    return func.tsrange(available_from, available_to, literal_column("'[]'"))
+
+# Location as a geometric point (x = longitude, y = latitude); the GiST index
+# on it answers bounding-box (<@ box) queries
+def location_point(longitude, latitude):
+    return func.point(longitude, latitude)
+
 class Listing(Base):
     __tablename__ = "listings"
 
@@ -32,20 +60,53 @@ class Listing(Base):
     available_from = Column(DateTime, nullable=False)
     available_to = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     host = Column(String, default="Active")
     amenities = Column(Text, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
 
     # Relationships
     user = relationship("User", back_populates="listings")
     images = relationship("ListingImage", back_populates="listing", cascade="all, delete-orphan")
     messages = relationship("Message", back_populates="listing", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of the feed orders by (created_at, id)
+        Index("ix_listings_created_at_id", "created_at", "id"),
+        # A host's own listings, newest first
+        Index("ix_listings_user_id_created_at", "user_id", "created_at", "id"),
+        # Structured search: location narrows first, then price range
+        Index("ix_listings_state_city_price", func.lower(state), func.lower(city), price),
+        Index("ix_listings_property_type_price", property_type, price),
+        Index("ix_listings_bedrooms_bathrooms_price", bedrooms, bathrooms, price),
+        Index(
+            "ix_listings_availability",
+            availability_range(available_from, available_to),
+            postgresql_using="gist"
+        ),
+        Index(
+            "ix_listings_location",
+            location_point(longitude, latitude),
+            postgresql_using="gist"
+        ),
+        Index(
+            "ix_listings_search_document",
+            search_document(title, amenities, description),
+            postgresql_using="gin"
+        ),
+    )
+
+listing_search_document = search_document(Listing.title, Listing.amenities, Listing.description)
+listing_availability = availability_range(Listing.available_from, Listing.available_to)
+listing_location = location_point(Listing.longitude, Listing.latitude)
+
 class ListingImage(Base):
     __tablename__ = "listing_images"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    listing_id = Column(UUID(as_uuid=True), ForeignKey("listings.id"), nullable=False)
+    listing_id = Column(UUID(as_uuid=True), ForeignKey("listings.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     image_url = Column(String, nullable=False)
 
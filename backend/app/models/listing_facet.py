@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Integer
+from ..core.database import Base
+
+class ListingFacetCount(Base):
+    """
+    Number of listings per facet value (e.g. property_type = "Apartment").
+    Maintained incrementally by the listing write routes; see app/services/facets.py.
+    """
+    __tablename__ = "listing_facet_counts"
+
+    facet = Column(String, primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, String, Text, TIMESTAMP, text
+from sqlalchemy import Column, ForeignKey, Index, String, Text, TIMESTAMP, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -6,6 +6,11 @@ import uuid
 from ..core.database import Base
 
 class Message(Base):
+    """
+    Range-partitioned by month on timestamp (see app.services.partitions).
+    Postgres requires the partition key in the primary key, so the table key
+    is (id, timestamp); the ORM still identifies a message by id alone.
+    """
     __tablename__ = "messages"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -13,10 +18,18 @@ class Message(Base):
     receiver_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     listing_id = Column(UUID(as_uuid=True), ForeignKey("listings.id"), nullable=False)
     content = Column(Text, nullable=False)
-    timestamp = Column(TIMESTAMP(timezone=True), nullable=False)
+    timestamp = Column(TIMESTAMP(timezone=True), primary_key=True, nullable=False)
 
     # Relationships
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_messages")
     receiver = relationship("User", foreign_keys=[receiver_id], back_populates="received_messages")
     listing = relationship("Listing", back_populates="messages")
-    
\ No newline at end of file
+
+    __table_args__ = (
+        # Keyset pagination of conversation history and per-user history on (timestamp, id)
+        Index("ix_messages_conversation_timestamp", "listing_id", "sender_id", "receiver_id", "timestamp", "id"),
+        Index("ix_messages_receiver_timestamp", "receiver_id", "timestamp", "id"),
+        Index("ix_messages_sender_timestamp", "sender_id", "timestamp", "id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
@@ -1,13 +1,25 @@
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from ..core.database import Base
+from datetime import datetime
+import hashlib
+
+def key_fingerprint(public_key: str) -> str:
+    """
+    SHA-256 of the key as uploaded (base64 text), hex encoded
+    """
+    return hashlib.sha256(public_key.encode()).hexdigest()
 
 class PublicKey(Base):
     __tablename__ = "public_keys"
 
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
     public_key = Column(String, nullable=False)
+    fingerprint = Column(String(64), nullable=True)
+    # Bumped every time the user uploads a different key
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Optional: Establish relationship
     user = relationship("User", back_populates="public_key", uselist=False)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from ..core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from ..core.database import get_async_db
 from ..models.user import User
 from ..auth.utils import verify_password, get_password_hash, create_access_token, get_current_user
 from datetime import timedelta
@@ -10,6 +12,7 @@ from pydantic import BaseModel, EmailStr
 from ..services.email import send_welcome_email, send_password_reset_email
 import logging
 import secrets
+import uuid
 from datetime import datetime
 from fastapi import Body
 from ..models.verification_token import VerificationToken
@@ -54,39 +57,42 @@ class UserUpdate(BaseModel):
     email: EmailStr
 
 
+async def _user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
 @router.post("/signup", response_model=Token)
-async def signup(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await _user_by_email(db, user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    hashed_password = get_password_hash(user.password)
+    # bcrypt and the email API are blocking; keep them off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
     db_user = User(
         email=user.email,
         name=user.name,
         password_hash=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.flush()
     token = secrets.token_urlsafe(32)
     expires = datetime.utcnow() + timedelta(hours=1)
     db_token = VerificationToken(
-        user_id=str(db_user.id),
+        user_id=db_user.id,
         token=token,
         expires_at=expires
     )
     db.add(db_token)
-    db.commit()
-    send_verification_email(user.email, user.name, token)
+    await db.commit()
+    await run_in_threadpool(send_verification_email, user.email, user.name, token)
  
 
     # Send welcome email (do not block signup if it fails)
     try:
-        send_welcome_email(user.email, user.name)
+        await run_in_threadpool(send_welcome_email, user.email, user.name)
     except Exception as e:
         logging.error(f"Failed to send welcome email to {user.email}: {e}")
     
@@ -98,9 +104,9 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/token", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await _user_by_email(db, form_data.username)
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -134,8 +140,8 @@ async def get_current_user_info(
 
 
 @router.post("/forgot-password")
-async def forgot_password(data: ForgotPasswordRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+async def forgot_password(data: ForgotPasswordRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await _user_by_email(db, data.email)
     if not user:
         # For security, do not reveal if user exists
         return {"message": "If that email exists, a reset link has been sent."}
@@ -143,20 +149,20 @@ async def forgot_password(data: ForgotPasswordRequest, db: Session = Depends(get
     token = secrets.token_urlsafe(32)
     # Store token with expiry (1 hour)
     reset_tokens[token] = {"user_id": str(user.id), "expires": datetime.utcnow() + timedelta(hours=1)}
-    send_password_reset_email(user.email, token)
+    await run_in_threadpool(send_password_reset_email, user.email, token)
     return {"message": "If that email exists, a reset link has been sent."}
 
 @router.post("/reset-password")
-async def reset_password(data: ResetPasswordRequest, db: Session = Depends(get_db)):
+async def reset_password(data: ResetPasswordRequest, db: AsyncSession = Depends(get_async_db)):
     token_data = reset_tokens.get(data.token)
     if not token_data or token_data["expires"] < datetime.utcnow():
         raise HTTPException(status_code=400, detail="Invalid or expired token")
-    user = db.query(User).filter(User.id == token_data["user_id"]).first()
+    user = await db.get(User, uuid.UUID(token_data["user_id"]))
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
-    user.password_hash = get_password_hash(data.new_password)
+    user.password_hash = await run_in_threadpool(get_password_hash, data.new_password)
     user.is_verified = True 
-    db.commit()
+    await db.commit()
     # Invalidate token
     del reset_tokens[data.token]
     return {"message": "Password reset successful"} 
@@ -164,16 +170,16 @@ async def reset_password(data: ResetPasswordRequest, db: Session = Depends(get_d
 @router.put("/me")
 async def update_current_user(
     update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
+    # current_user was loaded through this same request-scoped session
     # Check if email is changing and already taken
     if update.email != current_user.email:
-        existing = db.query(User).filter(User.email == update.email).first()
+        existing = await _user_by_email(db, update.email)
         if existing:
             raise HTTPException(status_code=400, detail="Email already in use")
     current_user.name = update.name
     current_user.email = update.email
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
     return {"message": "Profile updated"} 
@@ -1,23 +1,46 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict
 from sqlalchemy import text  # ← add this
 
-from ..core.database import get_db
+from ..core.database import get_async_db, all_pool_stats, replica_router
+from ..core.cache import listing_cache, public_key_cache
 
 router = APIRouter()
 
+def _replicas() -> Dict[str, Dict[str, Any]]:
+    return {replica.name: replica.status() for replica in replica_router.replicas}
+
 @router.get("/", tags=["health"])
-async def health_check(db: Session = Depends(get_db)) -> Dict[str, str]:
+async def health_check(db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
     try:
-        db.execute(text("SELECT 1"))  # ← fix here
+        await db.execute(text("SELECT 1"))
         return {
             "status": "healthy",
-            "database": "connected"
+            "database": "connected",
+            "pools": {
+                name: {key: stats[key] for key in ("size", "checked_out", "overflow", "timeouts")}
+                for name, stats in all_pool_stats().items()
+            },
+            "replicas": _replicas(),
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "database": "disconnected",
-            "error": str(e)
+            "error": str(e),
+            "pools": all_pool_stats(),
+            "replicas": _replicas(),
         }
+
+@router.get("/pool", tags=["health"])
+async def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Connection pool gauges and checkout-time histograms (cumulative buckets,
+    upper bounds in seconds) for the primary and replica engines
+    """
+    return all_pool_stats()
+
+@router.get("/cache", tags=["health"])
+async def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {"listings": listing_cache.stats(), "public_keys": public_key_cache.stats()}
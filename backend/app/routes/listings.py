@@ -1,24 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form, Request
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, Form, Request
+from sqlalchemy import and_, cast, func, literal_column, select, tuple_
+from sqlalchemy.types import DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, joinedload
+from starlette.concurrency import run_in_threadpool
+from typing import List, Literal, Optional
 from datetime import datetime
 import os
 from ..schemas.listing import ListingImage as ListingImageSchema
 import shutil
 import uuid
-import logging
 import mimetypes
+import math
 import boto3
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError
-from ..core.database import get_db
-from ..models.listing import Listing, ListingImage
+from ..core.database import get_db, get_async_db, get_async_read_db, record_writes
+from ..core.pagination import encode_cursor, decode_cursor
+from ..core.cache import listing_cache, listing_invalidations
+from ..core.etag import make_etag, etag_matches, set_etag, not_modified
+from ..core.responses import FastJSONResponse
+from ..core.log import get_logger
+from ..models.listing import Listing, ListingImage, SEARCH_CONFIG, listing_search_document, listing_availability, listing_location
 from ..models.user import User
-from ..schemas.listing import ListingCreate, ListingUpdate, ListingResponse, Listing as ListingSchema, ListingImage as ListingImageSchema
+from ..schemas.listing import ListingCreate, ListingUpdate, ListingResponse, ListingSearchResult, PropertyType, listing_payload, naive_utc, check_availability, Listing as ListingSchema, ListingImage as ListingImageSchema
 from ..core.security import get_current_user
+from ..services.geocoding import get_geocoder
+from ..services.facets import facet_values, apply_facet_delta, get_facet_counts
 from ..auth.utils import get_current_user as auth_get_current_user
 
-router = APIRouter()
-logger = logging.getLogger(__name__)
+router = APIRouter(default_response_class=FastJSONResponse)
+logger = get_logger(__name__)
 
 # Initialize S3 client
 s3_client = boto3.client(
@@ -31,257 +42,377 @@ s3_client = boto3.client(
 # S3 bucket name
 S3_BUCKET = os.getenv('S3_BUCKET_NAME', "sublet-match-images")
 
+def _listing_with_relations():
+    # Load images and owner alongside the listing instead of one query per row
+    return select(Listing).options(
+        selectinload(Listing.images),
+        joinedload(Listing.user)
+    )
+
+def _invalidate_listing(listing_id) -> None:
+    listing_cache.delete(str(listing_id))
+    listing_invalidations.set(str(listing_id), True)
+
+def _listing_etag(listing: Listing) -> str:
+    # Row version plus everything embedded from other tables
+    user = listing.user
+    return make_etag([
+        listing.id,
+        listing.updated_at or listing.created_at,
+        *sorted(str(image.id) for image in listing.images),
+        user.id if user else None,
+        user.name if user else None,
+        user.email if user else None,
+    ])
+
+def _list_etag(listings: List[Listing], *extra) -> str:
+    return make_etag([*(_listing_etag(listing) for listing in listings), *extra])
+
 @router.get("/my", response_model=List[ListingSchema])
 async def get_my_listings(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
-        listings = db.query(Listing).filter(Listing.user_id == current_user.id).all()
+        listings = (await db.execute(
+            _listing_with_relations()
+            .where(Listing.user_id == current_user.id)
+            .order_by(Listing.created_at.desc(), Listing.id.desc())
+        )).scalars().all()
+        etag = _list_etag(listings)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
         return listings
     except Exception as e:
-        logger.error(f"Error fetching user listings: {str(e)}")
+        logger.exception("listings_fetch_mine_failed", route="get_my_listings")
         raise HTTPException(status_code=400, detail=str(e))
 
+def _geocode_listing(listing: Listing):
+    coordinates = get_geocoder().geocode(listing.address, listing.city, listing.state)
+    listing.latitude, listing.longitude = coordinates if coordinates else (None, None)
+
 @router.post("/create", response_model=ListingSchema)
 async def create_listing(
-    request: Request,
     listing: ListingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     try:
-        # Log the raw request body
-        body = await request.body()
-        logger.info(f"Raw request body: {body.decode()}")
-        
-        # Log the parsed listing data
-        logger.info(f"Parsed listing data: {listing.model_dump()}")
-        
+        logger.payload("listing_create_payload", listing.model_dump, route="create_listing")
+
         db_listing = Listing(
             **listing.model_dump(),
             user_id=current_user.id
         )
+        # Geocoding may be a network call
+        await run_in_threadpool(_geocode_listing, db_listing)
         db.add(db_listing)
-        db.commit()
-        db.refresh(db_listing)
-        return db_listing
+        added = facet_values(db_listing)
+        await db.run_sync(lambda session: apply_facet_delta(session, added=added))
+        await db.commit()
+        record_writes(db_listing.id)
+        logger.info("listing_created", route="create_listing", listing_id=db_listing.id, user_id=current_user.id)
+        # Reload with images so serialization never lazy-loads
+        return (await db.execute(_listing_with_relations().where(Listing.id == db_listing.id))).scalar_one()
     except Exception as e:
-        logger.error(f"Error creating listing: {str(e)}")
-        db.rollback()
+        logger.exception("listing_create_failed", route="create_listing")
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
+async def _page_listings(db: AsyncSession, query, request: Request, skip: int, limit: int, cursor: Optional[str]):
+    # Newest first; a cursor continues after the last row of the previous page
+    query = query.order_by(Listing.created_at.desc(), Listing.id.desc())
+    if cursor:
+        created_at, listing_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Listing.created_at, Listing.id) < (created_at, listing_id))
+    else:
+        query = query.offset(skip)
+    listings = (await db.execute(query.limit(limit))).scalars().all()
+
+    next_cursor = None
+    if len(listings) == limit and listings[-1].created_at is not None:
+        last = listings[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    # Revalidation only needs the rows' versions, not a serialized page
+    etag = _list_etag(listings, next_cursor)
+    if etag_matches(request, etag):
+        response = not_modified(etag)
+    else:
+        # Trusted ORM-to-JSON encoding; skips response_model validation
+        response = FastJSONResponse([
+            listing_payload(listing)
+            for listing in listings
+            if listing.user is not None  # Skip listings without a valid user
+        ])
+        set_etag(response, etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
 @router.get("/", response_model=List[ListingResponse])
 async def get_listings(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
     skip: int = 0,
-    limit: int = 10
+    limit: int = 10,
+    cursor: Optional[str] = None
 ):
+    """
+    Newest listings first. Pass the X-Next-Cursor header of a page back as
+    `cursor` to fetch the next one; `skip` is ignored when a cursor is given.
+    """
     try:
-        # Get all listings with their images and user data
-        listings = db.query(Listing).offset(skip).limit(limit).all()
-        
-        # Convert to response model with full image URLs
-        response_listings = []
-        for listing in listings:
-            # Get the listing images
-            images = db.query(ListingImage).filter(ListingImage.listing_id == listing.id).all()
-            
-            # Get the user data
-            user = db.query(User).filter(User.id == listing.user_id).first()
-            if not user:
-                continue  # Skip listings without a valid user
-            
-            # Convert to response model
-            response_data = {
-                "id": listing.id,
-                "title": listing.title,
-                "description": listing.description,
-                "price": listing.price,
-                "address": listing.address,
-                "city": listing.city,
-                "state": listing.state,
-                "property_type": listing.property_type,
-                "bedrooms": listing.bedrooms,
-                "bathrooms": listing.bathrooms,
-                "available_from": listing.available_from,
-                "available_to": listing.available_to,
-                "user_id": listing.user_id,
-                "created_at": listing.created_at,
-                "host": listing.host,
-                "amenities": listing.amenities,
-                "images": [{
-                    "id": image.id,
-                    "listing_id": image.listing_id,
-                    "created_at": image.created_at,
-                    "image_url": f"{image.image_url}"
-                } for image in images],
-                "user": {
-                    "id": user.id,
-                    "name": user.name,
-                    "email": user.email
-                }
-            }
-            response_listings.append(ListingResponse(**response_data))
-        
-        return response_listings
+        return await _page_listings(db, _listing_with_relations(), request, skip, limit, cursor)
+    except Exception as e:
+        logger.exception("listings_fetch_failed", route="get_listings")
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _as_timestamp(value: Optional[datetime]):
+    # None leaves the bound open
+    return cast(value, DateTime)
+
+def _availability_filter(start: Optional[datetime], end: Optional[datetime], mode: str):
+    if mode == "covers":
+        # A one-sided window covers a single point in time
+        start, end = start or end, end or start
+    window = func.tsrange(_as_timestamp(start), _as_timestamp(end), literal_column("'[]'"))
+    return listing_availability.op("@>" if mode == "covers" else "&&")(window)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.045
+
+def _bounding_box_filter(min_lat: float, min_lng: float, max_lat: float, max_lng: float):
+    box = func.box(func.point(min_lng, min_lat), func.point(max_lng, max_lat))
+    return listing_location.op("<@")(box)
+
+def _radius_filter(lat: float, lng: float, radius_km: float):
+    # Indexed bounding-box prefilter, then the exact great-circle distance
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlng = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    box = _bounding_box_filter(lat - dlat, lng - dlng, lat + dlat, lng + dlng)
+    half_dlat = func.radians(Listing.latitude - lat) / 2
+    half_dlng = func.radians(Listing.longitude - lng) / 2
+    a = (
+        func.power(func.sin(half_dlat), 2)
+        + math.cos(math.radians(lat)) * func.cos(func.radians(Listing.latitude)) * func.power(func.sin(half_dlng), 2)
+    )
+    distance_km = 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(a))
+    return and_(box, distance_km <= radius_km)
+
+async def _rank_listings(db: AsyncSession, query, q: str, skip: int, limit: int):
+    # Best matches first, with a highlighted excerpt of the description
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(listing_search_document, tsquery)
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        Listing.description,
+        tsquery,
+        "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=10"
+    )
+    rows = (await db.execute(
+        query.filter(listing_search_document.op("@@")(tsquery))
+        .add_columns(rank, snippet)
+        .order_by(rank.desc(), Listing.id)
+        .offset(skip)
+        .limit(limit)
+    )).all()
+    return FastJSONResponse([
+        listing_payload(listing, rank=listing_rank, snippet=listing_snippet)
+        for listing, listing_rank, listing_snippet in rows
+        if listing.user is not None
+    ])
+
+@router.get("/search", response_model=List[ListingSearchResult])
+async def search_listings(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    q: Optional[str] = Query(None, max_length=200),
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_bedrooms: Optional[int] = Query(None, ge=0),
+    min_bathrooms: Optional[float] = Query(None, ge=0),
+    property_type: Optional[PropertyType] = None,
+    available_from: Optional[datetime] = None,
+    available_to: Optional[datetime] = None,
+    availability: Literal["covers", "overlaps"] = "covers",
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=500),
+    skip: int = 0,
+    limit: int = Query(10, gt=0, le=100),
+    cursor: Optional[str] = None
+):
+    """
+    Filter listings server-side. Every filter is optional and they combine with AND.
+    An availability window matches listings available for the whole window
+    (`availability=covers`) or for any part of it (`availability=overlaps`).
+    Given only one of `available_from`/`available_to`, `covers` matches
+    listings available on that date, and `overlaps` matches listings available
+    at any time from `available_from` on (or up to `available_to`).
+    Map views pass either a bounding box (min/max lat/lng) or a point and
+    `radius_km`; listings that could not be geocoded never match these.
+    Paging works the same as the feed, except that full-text searches (`q`) are
+    ordered by relevance and page with `skip` only.
+    """
+    try:
+        available_from, available_to = naive_utc(available_from), naive_utc(available_to)
+        check_availability(available_from, available_to)
+        query = _listing_with_relations()
+        if state:
+            query = query.filter(func.lower(Listing.state) == state.lower())
+        if city:
+            query = query.filter(func.lower(Listing.city) == city.lower())
+        if min_price is not None:
+            query = query.filter(Listing.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Listing.price <= max_price)
+        if min_bedrooms is not None:
+            query = query.filter(Listing.bedrooms >= min_bedrooms)
+        if min_bathrooms is not None:
+            query = query.filter(Listing.bathrooms >= min_bathrooms)
+        if property_type is not None:
+            query = query.filter(Listing.property_type == property_type.value)
+        bbox = (min_lat, min_lng, max_lat, max_lng)
+        if any(v is not None for v in bbox):
+            if any(v is None for v in bbox):
+                raise ValueError("Bounding box needs min_lat, min_lng, max_lat and max_lng")
+            if min_lat > max_lat or min_lng > max_lng:
+                raise ValueError("Bounding box minimums must not exceed maximums")
+            query = query.filter(_bounding_box_filter(min_lat, min_lng, max_lat, max_lng))
+        if any(v is not None for v in (lat, lng, radius_km)):
+            if lat is None or lng is None or radius_km is None:
+                raise ValueError("Radius search needs lat, lng and radius_km")
+            query = query.filter(_radius_filter(lat, lng, radius_km))
+        if available_from is not None or available_to is not None:
+            query = query.filter(_availability_filter(available_from, available_to, availability))
+
+        if q and q.strip():
+            return await _rank_listings(db, query, q, skip, limit)
+        return await _page_listings(db, query, request, skip, limit, cursor)
     except Exception as e:
-        logger.error(f"Error fetching listings: {str(e)}")
+        logger.exception("listings_search_failed", route="search_listings")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/facets")
+async def get_listing_facets(db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Listing counts per city, property type, bedroom count and price bucket,
+    read from the incrementally maintained listing_facet_counts table.
+    """
+    try:
+        return await db.run_sync(get_facet_counts)
+    except Exception as e:
+        logger.exception("listing_facets_failed", route="get_listing_facets")
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{listing_id}", response_model=ListingResponse)
 async def get_listing(
     listing_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     try:
-        listing = db.query(Listing).filter(Listing.id == listing_id).first()
+        listing_uuid = uuid.UUID(listing_id)
+        cache_key = str(listing_uuid)
+        cached = listing_cache.get(cache_key)
+        if cached is not None:
+            etag, body = cached
+            if etag_matches(request, etag):
+                return not_modified(etag)
+            response = FastJSONResponse(body)
+            set_etag(response, etag)
+            return response
+
+        listing = (await db.execute(_listing_with_relations().where(Listing.id == listing_uuid))).scalars().first()
         if not listing:
             raise HTTPException(status_code=404, detail="Listing not found")
-        
-        # Get the listing images
-        images = db.query(ListingImage).filter(ListingImage.listing_id == listing_id).all()
-        
-        # Get the user data
-        user = db.query(User).filter(User.id == listing.user_id).first()
-        if not user:
+        if not listing.user:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        # Convert to response model with full image URLs
-        response_data = {
-            "id": listing.id,
-            "title": listing.title,
-            "description": listing.description,
-            "price": listing.price,
-            "address": listing.address,
-            "city": listing.city,
-            "state": listing.state,
-            "property_type": listing.property_type,
-            "bedrooms": listing.bedrooms,
-            "bathrooms": listing.bathrooms,
-            "available_from": listing.available_from,
-            "available_to": listing.available_to,
-            "user_id": listing.user_id,
-            "created_at": listing.created_at,
-            "host": listing.host,
-            "amenities": listing.amenities,
-            "images": [{
-                "id": image.id,
-                "listing_id": image.listing_id,
-                "created_at": image.created_at,
-                "image_url": image.image_url
-            } for image in images],
-            "user": {
-                "id": user.id,
-                "name": user.name,
-                "email": user.email
-            }
-        }
-        return ListingResponse(**response_data)
+
+        etag = _listing_etag(listing)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        response = FastJSONResponse(listing_payload(listing))
+        if db.info.get("replica") is None or listing_invalidations.get(cache_key) is None:
+            listing_cache.set(cache_key, (etag, response.body))
+        set_etag(response, etag)
+        return response
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching listing: {str(e)}")
+        logger.exception("listing_fetch_failed", route="get_listing", listing_id=listing_id)
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.put("/{listing_id}", response_model=ListingResponse)
-async def update_listing(
-    listing_id: str,
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+def _apply_listing_update(db: Session, listing_id: str, user_id, update_data: dict) -> ListingResponse:
     db_listing = db.query(Listing).filter(Listing.id == listing_id).first()
     if not db_listing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Listing not found"
         )
-    
-    # Log initial description
 
-    # print(f"Initial desription: {db_listing.description}")
-    
-    if db_listing.user_id != current_user.id:
+    if db_listing.user_id != user_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this listing"
         )
 
-    # Log raw request body
-    print(f"Raw request body: {request.body()}")
-
-    # Log form data
-    form_data = await request.form()
-    print(f"Form data keys: {form_data.keys()}")
-
-    # Log each field
-    for field in form_data:
-        value = form_data[field]
-        print(f"Field: {field}, Value: {value}")
-        if hasattr(value, 'filename'):
-            print(f"File field: {field}, Filename: {value.filename}")
+    # Form values are strings; the sync driver lets Postgres coerce them, but
+    # dates are parsed here so a reversed window is a 400 rather than a 500
+    dates = {field: update_data[field] for field in ("available_from", "available_to") if field in update_data}
+    if dates:
+        try:
+            update_data.update(ListingUpdate.model_validate(dates).model_dump(include=dates.keys()))
+            check_availability(
+                update_data.get("available_from", db_listing.available_from),
+                update_data.get("available_to", db_listing.available_to),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    # Convert form data to dict
-    update_data = {k: v for k, v in form_data.items() if k != 'images'}
-    print(f"Update data after form conversion: {update_data}")
-    
-    # Log description in update data if present
-    if 'description' in update_data:
-        print(f"Description in update data: {update_data['description']}")
-    
+    previous_facets = facet_values(db_listing)
     for field, value in update_data.items():
         setattr(db_listing, field, value)
-    
-    # Log final description after update
-    print(f"Final description after update: {db_listing.description}")
-    
+    if {"address", "city", "state"} & update_data.keys():
+        _geocode_listing(db_listing)
+    apply_facet_delta(db, removed=previous_facets, added=facet_values(db_listing))
     db.commit()
-    db.refresh(db_listing)
-    
-    # Log description after commit
-    print(f"Final description after commit: {db_listing.description}")
+    _invalidate_listing(db_listing.id)
+    logger.info("listing_updated", route="update_listing", listing_id=db_listing.id, fields=lambda: sorted(update_data))
 
-    # Get the listing images
-    images = db.query(ListingImage).filter(ListingImage.listing_id == listing_id).all()
-    
-    # Get the user data
-    user = db.query(User).filter(User.id == db_listing.user_id).first()
-    if not user:
+    db_listing = db.execute(_listing_with_relations().where(Listing.id == db_listing.id)).scalars().first()
+    if not db_listing.user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    # Convert to response model with full image URLs
-    response_data = {
-        "id": db_listing.id,
-        "title": db_listing.title,
-        "description": db_listing.description,
-        "price": db_listing.price,
-        "address": db_listing.address,
-        "city": db_listing.city,
-        "state": db_listing.state,
-        "property_type": db_listing.property_type,
-        "bedrooms": db_listing.bedrooms,
-        "bathrooms": db_listing.bathrooms,
-        "available_from": db_listing.available_from,
-        "available_to": db_listing.available_to,
-        "user_id": db_listing.user_id,
-        "created_at": db_listing.created_at,
-        "host": db_listing.host,
-        "amenities": db_listing.amenities,
-        "images": [{
-            "id": image.id,
-            "listing_id": image.listing_id,
-            "created_at": image.created_at,
-            "image_url": image.image_url
-        } for image in images],
-        "user": {
-            "id": str(user.id),
-            "name": user.name,
-            "email": user.email
-        }
-    }
-    return ListingResponse(**response_data)
+
+    return ListingResponse.from_listing(db_listing)
+
+@router.put("/{listing_id}", response_model=ListingResponse)
+async def update_listing(
+    listing_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    form_data = await request.form()
+    update_data = {k: v for k, v in form_data.items() if k != 'images'}
+    logger.payload("listing_update_payload", lambda: update_data, route="update_listing", listing_id=listing_id)
+
+    # Blocking ORM work runs in the threadpool rather than on the event loop
+    return await run_in_threadpool(_apply_listing_update, db, listing_id, current_user.id, update_data)
 
 @router.delete("/{listing_id}")
-async def delete_listing(
+def delete_listing(
     listing_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -306,15 +437,17 @@ async def delete_listing(
             image_path = image.image_url.split('/')[-1]
             s3_client.delete_object(Bucket=S3_BUCKET, Key=image_path)
         except Exception as e:
-            logger.error(f"Error deleting S3 object: {str(e)}")
+            logger.error("s3_delete_failed", route="delete_listing", key=image_path, error=str(e))
         db.delete(image)
     
+    apply_facet_delta(db, removed=facet_values(db_listing))
     db.delete(db_listing)
     db.commit()
+    _invalidate_listing(db_listing.id)
     return {"message": "Listing deleted successfully"}
 
 @router.post("/{listing_id}/images", response_model=List[ListingImageSchema])
-async def upload_images(
+def upload_images(
     listing_id: str,
     images: List[UploadFile] = File(...),
     db: Session = Depends(get_db),
@@ -354,25 +487,26 @@ async def upload_images(
                 db.add(db_image)
 
             except Exception as e:
-                logger.error(f"Error uploading {image.filename}: {e}")
+                logger.error("image_upload_failed", route="upload_images", filename=image.filename, error=str(e))
                 raise HTTPException(
                     status_code=500,
                     detail=f"Failed to upload image {image.filename}: {str(e)}"
                 )
 
         db.commit()
+        _invalidate_listing(listing.id)
 
         return db.query(ListingImage).filter(ListingImage.listing_id == listing_id).all()
 
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Unexpected error uploading images: {e}")
+    except Exception:
+        logger.exception("image_upload_unexpected_error", route="upload_images")
         db.rollback()
         raise HTTPException(status_code=500, detail="An unexpected error occurred while uploading images.")
 
 @router.delete("/{listing_id}/images/{image_id}")
-async def delete_listing_image(
+def delete_listing_image(
     listing_id: str,
     image_id: str,
     db: Session = Depends(get_db),
@@ -399,23 +533,22 @@ async def delete_listing_image(
         try:
             # Extract filename from S3 URL
             image_path = image.image_url.split('/')[-1]
-            logger.info(f"Attempting to delete S3 object: {image_path}")
             s3_client.delete_object(Bucket=S3_BUCKET, Key=image_path)
-            logger.info(f"Successfully deleted S3 object: {image_path}")
+            logger.info("s3_object_deleted", route="delete_listing_image", key=image_path)
         except Exception as e:
-            logger.error(f"Error deleting S3 object: {str(e)}")
             # Continue with database deletion even if S3 deletion fails
-            logger.warning("Continuing with database deletion despite S3 error")
+            logger.error("s3_delete_failed", route="delete_listing_image", key=image_path, error=str(e))
 
         # Delete from database
         db.delete(image)
         db.commit()
+        _invalidate_listing(listing.id)
 
         return {"message": "Image deleted successfully"}
 
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Unexpected error deleting image: {e}")
+    except Exception:
+        logger.exception("image_delete_unexpected_error", route="delete_listing_image")
         db.rollback()
         raise HTTPException(status_code=500, detail="An unexpected error occurred while deleting the image")
@@ -1,20 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from uuid import UUID
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, insert, or_, select, tuple_, union_all
+from uuid import UUID, uuid4
+from typing import List, Literal, Optional, Union
 from datetime import datetime, timezone
-import logging
-import json
+import asyncio
+import time
 
 from ..models.message import Message
-from ..schemas.message import MessageOut, MessageCreate, ConversationOut
-from ..core.database import get_db
+from ..schemas.message import (
+    MessageOut, MessageCreate, MessageBatchIn, MessageBatchItemOut, ConversationOut, MarkReadIn, ReadStateOut,
+    message_payload,
+)
+from ..core.database import get_db, get_read_db, record_writes, SessionLocal
+from ..core.responses import FastJSONResponse
+from ..core.pagination import encode_cursor, decode_cursor
 from ..models.user import User
 from ..models.listing import Listing
+from ..models.conversation import Conversation, ConversationParticipant
+from ..services.conversations import record_message, record_messages, mark_read
+from ..services.realtime import hub, fanout, encode_event
+from ..core.config import settings
+from ..core.log import get_logger
 
-router = APIRouter(tags=["Messages"])
-logger = logging.getLogger(__name__)
+router = APIRouter(tags=["Messages"], default_response_class=FastJSONResponse)
+logger = get_logger(__name__)
 
 @router.post("/", response_model=MessageOut)
 def create_message(message: MessageCreate, db: Session = Depends(get_db)):
@@ -22,20 +34,12 @@ def create_message(message: MessageCreate, db: Session = Depends(get_db)):
     Create a new message
     """
     try:
-        # Log the raw message data
-        logger.info(f"Raw message data: {json.dumps(message.model_dump(), default=str)}")
-        
-        # Log each field separately
-        logger.info(f"Content: {message.content}")
-        logger.info(f"Sender ID: {message.sender_id} (type: {type(message.sender_id)})")
-        logger.info(f"Receiver ID: {message.receiver_id} (type: {type(message.receiver_id)})")
-        logger.info(f"Listing ID: {message.listing_id} (type: {type(message.listing_id)})")
-        
+        logger.payload("message_create_payload", message.model_dump, route="create_message")
+
         # Convert string IDs to UUIDs
         sender_id = UUID(message.sender_id)
         receiver_id = UUID(message.receiver_id)
         listing_id = UUID(message.listing_id)
-        logger.info("Successfully converted all IDs to UUIDs")
         
         # Create the message
         db_message = Message(
@@ -46,155 +50,491 @@ def create_message(message: MessageCreate, db: Session = Depends(get_db)):
             timestamp=datetime.now(timezone.utc)
         )
         
-        # Add to database
+        # Add to database, along with its conversation
         db.add(db_message)
+        db.flush()
+        record_message(db, db_message)
+        fanout.publish(db, {"type": "message", "message": message_payload(db_message)})
         db.commit()
+        record_writes(sender_id, receiver_id)
         db.refresh(db_message)
-        
-        logger.info(f"Returning message with timestamp: {db_message.timestamp} (type: {type(db_message.timestamp)})")
-        
-        logger.info(f"Successfully created message with ID: {db_message.id}")
-        return MessageOut.from_orm(db_message)
+
+        logger.info(
+            "message_created", route="create_message",
+            message_id=db_message.id, listing_id=listing_id, sender_id=sender_id, receiver_id=receiver_id,
+        )
+        return FastJSONResponse(message_payload(db_message))
     except ValueError as e:
-        logger.error(f"Invalid UUID format: {str(e)}")
+        logger.warning("message_create_invalid_uuid", route="create_message", error=str(e))
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Invalid UUID format"
         )
-    except Exception as e:
+    except Exception:
         db.rollback()
-        logger.error(f"Error creating message: {str(e)}")
+        logger.exception("message_create_failed", route="create_message")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error creating message"
         )
 
+@router.post("/batch", response_model=List[MessageBatchItemOut])
+def create_messages(batch: MessageBatchIn, db: Session = Depends(get_db)):
+    """
+    Create several messages at once, e.g. a host answering many inquiries with
+    the same reply. All-or-nothing: every id is validated before anything is
+    written, and the messages are inserted in one statement and one transaction.
+    Results are returned in request order.
+    """
+    errors = []
+    rows = []
+    now = datetime.now(timezone.utc)
+    for index, item in enumerate(batch.messages):
+        row = {"id": uuid4(), "content": item.content, "timestamp": now}
+        for field in ("sender_id", "receiver_id", "listing_id"):
+            try:
+                row[field] = UUID(getattr(item, field))
+            except ValueError:
+                errors.append({"index": index, "field": field, "error": "Invalid UUID format"})
+        rows.append(row)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+    try:
+        # A single multi-row INSERT ... RETURNING; ids are generated here so
+        # the returned rows can be put back in request order
+        inserted = {m.id: m for m in db.scalars(insert(Message).returning(Message), rows)}
+        messages = [inserted[row["id"]] for row in rows]
+        conversation_ids = record_messages(db, messages)
+        payloads = [message_payload(m) for m in messages]
+        fanout.publish_many(db, [{"type": "message", "message": payload} for payload in payloads])
+        db.commit()
+        record_writes(*{user_id for row in rows for user_id in (row["sender_id"], row["receiver_id"])})
+    except Exception:
+        db.rollback()
+        logger.exception("message_batch_failed", route="create_messages", size=len(rows))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error creating messages"
+        )
+
+    return FastJSONResponse([
+        {"index": index, "conversation_id": str(conversation_ids[message.id]), "message": payload}
+        for index, (message, payload) in enumerate(zip(messages, payloads))
+    ])
+
 @router.get("/conversations/{user_id}", response_model=List[ConversationOut])
-def get_conversations(user_id: UUID, db: Session = Depends(get_db)):
+def get_conversations(user_id: UUID, db: Session = Depends(get_read_db)):
     """
     Get all conversations for a user, grouped by listing and other participant
     """
     try:
-        logger.info(f"Fetching conversations for user {user_id}")
-        
-        # Get all messages for the user
-        messages = db.query(Message).filter(
-            or_(
-                Message.sender_id == user_id,
-                Message.receiver_id == user_id
-            )
-        ).order_by(Message.timestamp.desc()).all()
-        
-        logger.info(f"Found {len(messages)} messages")
-        
-        # Group messages by listing_id and other participant
-        conversations = {}
-        for msg in messages:
-            # Always use the listing owner as the 'other participant'
-            listing = db.query(Listing).filter(Listing.id == msg.listing_id).first()
-            if not listing:
+        logger.info("conversations_fetch", route="get_conversations", user_id=user_id)
+
+        # Indexed range scan over the user's participant rows, newest first
+        rows = (
+            db.query(ConversationParticipant, Conversation.listing_id, Message, Listing.user_id, Listing.title)
+            .join(Conversation, Conversation.id == ConversationParticipant.conversation_id)
+            # last_activity_at is the last message's timestamp; matching on it
+            # lets the lookup go straight to that message's partition
+            .join(Message, and_(
+                Message.id == Conversation.last_message_id,
+                Message.timestamp == Conversation.last_activity_at,
+            ))
+            .join(Listing, Listing.id == Conversation.listing_id)
+            .filter(ConversationParticipant.user_id == user_id)
+            .order_by(ConversationParticipant.last_activity_at.desc())
+            .all()
+        )
+
+        # One batched lookup for every participant
+        user_ids = {user_id} | {row[0].counterpart_id for row in rows} | {row[3] for row in rows}
+        users = {user.id: user for user in db.query(User).filter(User.id.in_(user_ids)).all()}
+        current_user = users.get(user_id)
+        current_user_name = current_user.name if current_user else "Unknown User"
+
+        conversation_list = []
+        seen = set()
+        for participant, listing_id, msg, listing_owner_id, listing_title in rows:
+            # The other participant is always the listing owner, unless the
+            # user is the owner, in which case it is the conversation counterpart
+            other_user_id = participant.counterpart_id if listing_owner_id == user_id else listing_owner_id
+            key = f"{listing_id}_{other_user_id}"
+            if key in seen:
+                continue
+            seen.add(key)
+
+            owner = users.get(listing_owner_id)
+            if not owner:
+                logger.warning("conversation_listing_owner_missing", route="get_conversations", owner_id=listing_owner_id)
                 continue
-            listing_owner_id = str(listing.user_id)
-            key = f"{msg.listing_id}_{listing_owner_id if str(user_id) != listing_owner_id else msg.sender_id if str(msg.sender_id) != str(user_id) else msg.receiver_id}"
-
-            if key not in conversations:
-                # Get the listing owner's information
-                owner = db.query(User).filter(User.id == listing_owner_id).first()
-                if not owner:
-                    logger.warning(f"Could not find listing owner {listing_owner_id}")
-                    continue
-                # Get the current user's information
-                current_user = db.query(User).filter(User.id == user_id).first()
-                current_user_name = current_user.name if current_user else "Unknown User"
-                # Get the listing title
-                listing_title = listing.title
-                # Participants: always [current user, listing owner] (other is always owner)
-                participants = []
-                if str(user_id) == listing_owner_id:
-                    # Current user is the owner, so the other is the message sender or receiver
-                    other_user_id = str(msg.receiver_id) if str(msg.sender_id) == str(user_id) else str(msg.sender_id)
-                    other_user = db.query(User).filter(User.id == other_user_id).first()
-                    if not other_user:
-                        continue
-                    participants = [
-                        {"id": str(user_id), "username": current_user_name},
-                        {"id": other_user_id, "username": other_user.name or other_user.email}
-                    ]
-                else:
-                    # Current user is not the owner, so show owner as the other participant
-                    participants = [
-                        {"id": str(user_id), "username": current_user_name},
-                        {"id": listing_owner_id, "username": owner.name or owner.email}
-                    ]
-                conversation_data = {
-                    "id": key,
+            other_user = users.get(other_user_id)
+            if not other_user:
+                continue
+            conversation_data = {
+                "id": key,
+                "listing_id": str(msg.listing_id),
+                "listing_title": listing_title,
+                "listing_owner_id": str(listing_owner_id),
+                "participants": [
+                    {"id": str(user_id), "username": current_user_name},
+                    {"id": str(other_user_id), "username": other_user.name or other_user.email}
+                ],
+                "lastMessage": {
+                    "id": str(msg.id),
+                    "content": msg.content,
+                    "sender_id": str(msg.sender_id),
+                    "receiver_id": str(msg.receiver_id),
                     "listing_id": str(msg.listing_id),
-                    "listing_title": listing_title,
-                    "listing_owner_id": listing_owner_id,
-                    "participants": participants,
-                    "lastMessage": {
-                        "id": str(msg.id),
-                        "content": msg.content,
-                        "sender_id": str(msg.sender_id),
-                        "receiver_id": str(msg.receiver_id),
-                        "listing_id": str(msg.listing_id),
-                        "timestamp": msg.timestamp
-                    },
-                    "unreadCount": 0  # We'll implement this later
-                }
-                
-                logger.info(f"Created conversation data: {json.dumps(conversation_data, default=str)}")
-                conversations[key] = conversation_data
-        
-        # Convert to ConversationOut models using from_dict
-        conversation_list = []
-        for conv in conversations.values():
+                    "timestamp": msg.timestamp
+                },
+                "unreadCount": participant.unread_count
+            }
             try:
-                conversation_list.append(ConversationOut.from_dict(conv))
+                conversation_list.append(ConversationOut.from_dict(conversation_data))
             except Exception as e:
-                logger.error(f"Error converting conversation: {str(e)}")
-                logger.error(f"Conversation data: {json.dumps(conv, default=str)}")
+                logger.error("conversation_convert_failed", route="get_conversations", error=str(e))
                 continue
-        
-        logger.info(f"Returning {len(conversation_list)} conversations")
+
+        logger.info("conversations_fetched", route="get_conversations", user_id=user_id, count=len(conversation_list))
         return conversation_list
-    except Exception as e:
-        logger.error(f"Error fetching conversations: {str(e)}")
+    except Exception:
+        logger.exception("conversations_fetch_failed", route="get_conversations", user_id=user_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error fetching conversations"
         )
 
+@router.post("/read", response_model=ReadStateOut)
+def mark_conversation_read(payload: MarkReadIn, db: Session = Depends(get_db)):
+    """
+    Mark a conversation read up to (and including) a message
+    """
+    try:
+        user_id = UUID(payload.user_id)
+        message_id = UUID(payload.message_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid UUID format"
+        )
+
+    message = db.query(Message).filter(Message.id == message_id).first()
+    if not message or user_id not in (message.sender_id, message.receiver_id):
+        raise HTTPException(status_code=404, detail="Message not found")
+
+    try:
+        participant = mark_read(db, user_id, message)
+        db.commit()
+        record_writes(user_id)
+    except LookupError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    except Exception:
+        db.rollback()
+        logger.exception("conversation_mark_read_failed", route="mark_conversation_read")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error marking conversation read"
+        )
+
+    return {
+        "conversation_id": str(participant.conversation_id),
+        "last_read_message_id": str(participant.last_read_message_id),
+        "unreadCount": participant.unread_count
+    }
+
+MESSAGE_PAGE_LIMIT = 200
+MAX_WAIT_SECONDS = 60
+
+def _page_messages(db: Session, branches, before: Optional[str], after: Optional[str], limit: int):
+    """
+    One page of messages in ascending (timestamp, id) order: the newest `limit`
+    messages, or those just before / just after a cursor. `branches` are
+    disjoint filters, one per message direction: each is paged on its own so
+    Postgres can walk its (..., timestamp, id) index in order and stop after
+    `limit` rows, where an OR of the directions would sort the whole history.
+    """
+    # The plain timestamp bound is redundant with the row comparison but is
+    # what lets Postgres prune the monthly message partitions
+    position = tuple_(Message.timestamp, Message.id)
+    if after:
+        timestamp, row_id = decode_cursor(after)
+        bounds = (Message.timestamp >= timestamp, position > (timestamp, row_id))
+        order = (Message.timestamp, Message.id)
+    else:
+        bounds = ()
+        if before:
+            timestamp, row_id = decode_cursor(before)
+            bounds = (Message.timestamp <= timestamp, position < (timestamp, row_id))
+        order = (Message.timestamp.desc(), Message.id.desc())
+
+    # Each branch is wrapped in a subquery: SQLite rejects ORDER BY/LIMIT
+    # directly inside a UNION
+    pages = [
+        select(page.c)
+        for page in (
+            select(Message).where(condition, *bounds).order_by(*order).limit(limit).subquery()
+            for condition in branches
+        )
+    ]
+    merged = aliased(Message, union_all(*pages).subquery() if len(pages) > 1 else pages[0].subquery())
+    merged_order = (merged.timestamp, merged.id) if after else (merged.timestamp.desc(), merged.id.desc())
+    messages = db.execute(select(merged).order_by(*merged_order).limit(limit)).scalars().all()
+    if not after:
+        messages.reverse()
+    return messages
+
+def _message_page_response(messages: List[Message], newest_first: bool = False):
+    # Cursors to load older messages (before=) or poll for newer ones (after=)
+    response = FastJSONResponse([
+        message_payload(msg) for msg in (reversed(messages) if newest_first else messages)
+    ])
+    if messages:
+        response.headers["X-Before-Cursor"] = encode_cursor(messages[0].timestamp, messages[0].id)
+        response.headers["X-After-Cursor"] = encode_cursor(messages[-1].timestamp, messages[-1].id)
+    return response
+
 @router.get("/conversation/{listing_id}/{user1_id}/{user2_id}", response_model=List[MessageOut])
 def get_conversation(
     listing_id: UUID,
     user1_id: UUID,
     user2_id: UUID,
-    db: Session = Depends(get_db)
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, gt=0, le=MESSAGE_PAGE_LIMIT),
+    db: Session = Depends(get_read_db)
 ):
     """
-    Get all messages in a specific conversation between two users about a listing
+    Get the messages in a specific conversation between two users about a listing,
+    oldest first. Without a cursor this is the latest `limit` messages; pass the
+    X-Before-Cursor / X-After-Cursor response headers back as `before` / `after`
+    to page through older messages or fetch newer ones.
     """
-    messages = db.query(Message).filter(
-        and_(
-            Message.listing_id == listing_id,
-        or_(
-            and_(Message.sender_id == user1_id, Message.receiver_id == user2_id),
-                and_(Message.sender_id == user2_id, Message.receiver_id == user1_id)
-            )
+    branches = [and_(Message.listing_id == listing_id, Message.sender_id == user1_id, Message.receiver_id == user2_id)]
+    if user2_id != user1_id:
+        branches.append(
+            and_(Message.listing_id == listing_id, Message.sender_id == user2_id, Message.receiver_id == user1_id)
         )
-    ).order_by(Message.timestamp).all()
-    return [MessageOut.from_orm(msg) for msg in messages]
+    try:
+        messages = _page_messages(db, branches, before, after, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return _message_page_response(messages)
 
 @router.get("/user/{user_id}", response_model=List[MessageOut])
-def get_all_messages_for_user(user_id: UUID, db: Session = Depends(get_db)):
+def get_all_messages_for_user(
+    user_id: UUID,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(50, gt=0, le=MESSAGE_PAGE_LIMIT),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Fetch messages sent or received by a user, newest first. Paged with
+    `before` / `after` cursors the same way as a conversation.
+    """
+    # Sent, then received; messages to oneself are only counted as sent
+    branches = [
+        Message.sender_id == user_id,
+        and_(Message.receiver_id == user_id, Message.sender_id != user_id),
+    ]
+    try:
+        messages = _page_messages(db, branches, before, after, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return _message_page_response(messages, newest_first=True)
+
+def _parse_since(since: str) -> Union[UUID, datetime]:
+    """
+    A `since` value is either a message id or an ISO-8601 timestamp
+    """
+    try:
+        return UUID(since)
+    except ValueError:
+        pass
+    timestamp = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+def _messages_since(user_id: UUID, since: Union[UUID, datetime], limit: int) -> List[dict]:
+    """
+    Messages to or from a user that come after a message id or timestamp, oldest first
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Message).filter(or_(Message.sender_id == user_id, Message.receiver_id == user_id))
+        if isinstance(since, UUID):
+            last = db.query(Message).filter(Message.id == since).first()
+            if not last:
+                return []
+            query = query.filter(
+                Message.timestamp >= last.timestamp,  # partition pruning
+                tuple_(Message.timestamp, Message.id) > (last.timestamp, last.id),
+            )
+        else:
+            query = query.filter(Message.timestamp > since)
+        messages = query.order_by(Message.timestamp, Message.id).limit(limit).all()
+        return [message_payload(msg) for msg in messages]
+    finally:
+        db.close()
+
+async def _backlog_pages(user_id: UUID, since: Union[UUID, datetime], page_size: int):
+    """
+    Every message after `since`, oldest first, as pages of up to `page_size`;
+    each page resumes from the last message of the one before. Streams replay
+    this in full before switching to live events.
+    """
+    while True:
+        page = await run_in_threadpool(_messages_since, user_id, since, page_size)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        since = UUID(page[-1]["id"])
+
+def _sse_event(payload: dict) -> str:
+    return f"id: {payload['id']}\nevent: message\ndata: {encode_event(payload)}\n\n"
+
+@router.get("/user/{user_id}/since", response_model=List[MessageOut])
+async def get_messages_since(
+    user_id: UUID,
+    request: Request,
+    since: Optional[str] = None,
+    mode: Literal["poll", "sse"] = "poll",
+    wait: int = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    limit: int = Query(100, gt=0, le=MESSAGE_PAGE_LIMIT),
+    last_event_id: Optional[str] = Header(None)
+):
     """
-    Fetch all messages sent or received by a user.
+    Messages to or from a user after `since` (a message id or a timestamp),
+    oldest first. Replaces re-downloading the whole history when polling.
+
+    mode=poll: with `wait` > 0 and nothing new, hold the request until a message
+    arrives or `wait` seconds pass, then answer (possibly with an empty list).
+    mode=sse: stream messages as Server-Sent Events for up to `wait` seconds
+    (MAX_WAIT_SECONDS when 0), starting with every message after `since`,
+    fetched `limit` at a time. Each event's id is the message id, so an
+    EventSource reconnect resumes through the Last-Event-ID header.
+
+    Resume from the id of the last message received. A timestamp only matches
+    messages strictly after it, and messages sent in one batch share a
+    timestamp, so resuming from the last one's timestamp can skip the rest of
+    its batch.
     """
-    messages = db.query(Message).filter(
-        or_(
-            Message.sender_id == user_id,
-            Message.receiver_id == user_id
+    try:
+        position = _parse_since(since or last_event_id or "")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since must be a message id or an ISO-8601 timestamp")
+
+    if mode == "sse":
+        return StreamingResponse(
+            _stream_messages(request, user_id, position, wait or MAX_WAIT_SECONDS, limit),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
         )
-    ).order_by(Message.timestamp.desc()).all()
-    return [MessageOut.from_orm(msg) for msg in messages]
+
+    # Subscribe before reading so a message committed in between is not missed.
+    # Waiting happens on the event loop; no worker thread is held meanwhile.
+    subscriber = hub.subscribe(user_id)
+    try:
+        messages = await run_in_threadpool(_messages_since, user_id, position, limit)
+        if not messages and wait:
+            try:
+                await asyncio.wait_for(subscriber.queue.get(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                messages = await run_in_threadpool(_messages_since, user_id, position, limit)
+        return FastJSONResponse(messages)
+    finally:
+        hub.unsubscribe(subscriber)
+
+async def _stream_messages(request: Request, user_id: UUID, position, duration: int, limit: int):
+    subscriber = hub.subscribe(user_id)
+    try:
+        sent_ids = set()
+        async for page in _backlog_pages(user_id, position, limit):
+            for payload in page:
+                sent_ids.add(payload["id"])
+                yield _sse_event(payload)
+            if await request.is_disconnected():
+                return
+
+        deadline = time.monotonic() + duration
+        heartbeat = settings.REALTIME_HEARTBEAT_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or await request.is_disconnected():
+                return
+            try:
+                event_data = await asyncio.wait_for(subscriber.queue.get(), timeout=min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            if event_data is None or subscriber.overflowed:
+                return
+            payload = event_data["message"]
+            if payload["id"] in sent_ids:
+                sent_ids.discard(payload["id"])
+                continue
+            yield _sse_event(payload)
+    finally:
+        hub.unsubscribe(subscriber)
+
+@router.websocket("/ws/{user_id}")
+async def message_stream(websocket: WebSocket, user_id: UUID, last_id: Optional[UUID] = None):
+    """
+    Push new messages to or from a user as {"type": "message", "message": MessageOut}.
+    The server sends {"type": "ping"} every REALTIME_HEARTBEAT_SECONDS and drops
+    clients that stay silent for two intervals; any client frame counts as a pong.
+    Reconnect with ?last_id=<id of the last message received> to resume: every
+    missed message is replayed, REALTIME_RESUME_LIMIT per query, before live ones. Clients that cannot keep up are
+    closed with code 1013 and should reconnect the same way.
+    """
+    await websocket.accept()
+    # Subscribe before reading the backlog so nothing falls between the two
+    subscriber = hub.subscribe(user_id)
+    last_seen = time.monotonic()
+
+    async def receive_loop():
+        nonlocal last_seen
+        while True:
+            await websocket.receive_text()
+            last_seen = time.monotonic()
+
+    receiver = asyncio.ensure_future(receive_loop())
+    try:
+        sent_ids = set()
+        if last_id is not None:
+            async for page in _backlog_pages(user_id, last_id, settings.REALTIME_RESUME_LIMIT):
+                for payload in page:
+                    sent_ids.add(payload["id"])
+                    await websocket.send_text(encode_event({"type": "message", "message": payload}))
+
+        heartbeat = settings.REALTIME_HEARTBEAT_SECONDS
+        while not receiver.done():
+            try:
+                event_data = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if time.monotonic() - last_seen > 2 * heartbeat:
+                    await websocket.close(code=1001)
+                    return
+                await websocket.send_text(encode_event({"type": "ping"}))
+                continue
+            if event_data is None or subscriber.overflowed:
+                await websocket.close(code=1013)
+                return
+            message_id = event_data["message"]["id"]
+            if message_id in sent_ids:
+                # Already replayed from the backlog
+                sent_ids.discard(message_id)
+                continue
+            await websocket.send_text(encode_event(event_data))
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        logger.exception("message_stream_failed", route="message_stream", user_id=user_id)
+    finally:
+        receiver.cancel()
+        hub.unsubscribe(subscriber)
@@ -0,0 +1,51 @@
+from typing import List
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..core import instrumentation
+from ..core.database import all_pool_stats
+from ..core.metrics import format_labels, render_histogram
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# metric name -> (pool_stats key, type, help)
+POOL_SAMPLES = {
+    "db_pool_size": ("size", "gauge", "Configured pool size"),
+    "db_pool_checked_out": ("checked_out", "gauge", "Connections currently checked out"),
+    "db_pool_overflow": ("overflow", "gauge", "Connections open beyond the pool size"),
+    "db_pool_timeouts_total": ("timeouts", "counter", "Checkouts that gave up after DB_POOL_TIMEOUT"),
+    "db_pool_slow_checkouts_total": ("slow_checkouts", "counter", "Checkouts slower than DB_POOL_SLOW_CHECKOUT_MS"),
+}
+
+
+def _pool_lines() -> List[str]:
+    pools = all_pool_stats()
+    lines = []
+    for metric, (key, kind, help_text) in POOL_SAMPLES.items():
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f"{metric}{format_labels({'pool': name})} {stats[key]}" for name, stats in pools.items()]
+    lines += ["# HELP db_pool_checkout_seconds Time to check out a connection", "# TYPE db_pool_checkout_seconds histogram"]
+    for name, stats in pools.items():
+        lines += render_histogram("db_pool_checkout_seconds", {"pool": name}, stats["checkout_seconds"])
+    return lines
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    """
+    Prometheus text exposition of the per-route request, SQL time and query
+    count histograms, the slow-query counter and the connection pool metrics
+    """
+    lines = [
+        *instrumentation.REQUEST_SECONDS.render(),
+        *instrumentation.REQUEST_DB_SECONDS.render(),
+        *instrumentation.REQUEST_QUERIES.render(),
+        "# HELP db_slow_queries_total Statements slower than DB_SLOW_QUERY_MS",
+        "# TYPE db_slow_queries_total counter",
+        f"db_slow_queries_total {instrumentation.slow_queries}",
+        *_pool_lines(),
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
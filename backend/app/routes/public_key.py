@@ -1,39 +1,139 @@
 # backend/app/routes/public_key.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from ..core.database import get_db
-from ..models.public_key import PublicKey
+from ..core.cache import public_key_cache
+from ..core.config import settings
+from ..core.etag import make_etag, etag_matches, set_etag, not_modified
+from ..core.responses import FastJSONResponse
+from ..models.public_key import PublicKey, key_fingerprint
 from uuid import UUID
 
 
-router = APIRouter(tags=["keys"])
+router = APIRouter(tags=["keys"], default_response_class=FastJSONResponse)
+
+MAX_LOOKUP_IDS = 200
 
 class PublicKeyUpload(BaseModel):
     user_id: UUID
     public_key: str  # Base64-encoded string
 
+class PublicKeyLookup(BaseModel):
+    user_ids: List[UUID] = Field(..., min_length=1, max_length=MAX_LOOKUP_IDS)
+
+def _key_payload(key: PublicKey) -> dict:
+    return {
+        "user_id": str(key.user_id),
+        "public_key": key.public_key,
+        # Rows written before fingerprints existed are fingerprinted on read
+        "fingerprint": key.fingerprint or key_fingerprint(key.public_key),
+        "version": key.version or 1,
+    }
+
+def _key_etag(payload: dict) -> str:
+    return f'"{payload["fingerprint"]}"'
+
 @router.post("/upload")
 def upload_public_key(payload: PublicKeyUpload, db: Session = Depends(get_db)):
     # Check if the user already has a key
     existing = db.query(PublicKey).filter(PublicKey.user_id == payload.user_id).first()
+    fingerprint = key_fingerprint(payload.public_key)
 
     if existing:
-        existing.public_key = payload.public_key  # Update if exists
+        if existing.public_key != payload.public_key:
+            existing.public_key = payload.public_key  # Update if exists
+            existing.version = (existing.version or 1) + 1
+        existing.fingerprint = fingerprint
     else:
-        new_key = PublicKey(user_id=payload.user_id, public_key=payload.public_key)
+        new_key = PublicKey(user_id=payload.user_id, public_key=payload.public_key, fingerprint=fingerprint, version=1)
         db.add(new_key)
 
     db.commit()
-    return {"status": "success"}
+    public_key_cache.delete(payload.user_id)
+    return {"status": "success", "fingerprint": fingerprint}
+
+def _lookup_keys(db: Session, user_ids: List[UUID]) -> dict:
+    user_ids = list(dict.fromkeys(user_ids))
+    found = {}
+    uncached = []
+    for user_id in user_ids:
+        cached = public_key_cache.get(user_id)
+        if cached is None:
+            uncached.append(user_id)
+        else:
+            found[user_id] = cached
+
+    if uncached:
+        for key in db.query(PublicKey).filter(PublicKey.user_id.in_(uncached)).all():
+            payload = _key_payload(key)
+            public_key_cache.set(key.user_id, payload)
+            found[key.user_id] = payload
 
-@router.get("/{user_id}")
-def get_public_key(user_id: UUID, db: Session = Depends(get_db)):
-    key = db.query(PublicKey).filter(PublicKey.user_id == user_id).first()
-    if not key:
-        raise HTTPException(status_code=404, detail="Public key not found")
     return {
-        "user_id": str(key.user_id),
-        "public_key": key.public_key
+        "keys": [found[user_id] for user_id in user_ids if user_id in found],
+        "missing": [str(user_id) for user_id in user_ids if user_id not in found],
     }
+
+@router.post("/lookup")
+def lookup_public_keys(lookup: PublicKeyLookup, db: Session = Depends(get_db)):
+    """
+    Fetch the keys of many users in one request, e.g. every counterpart in an
+    inbox. Users without a key are listed under "missing".
+    """
+    return _lookup_keys(db, lookup.user_ids)
+
+@router.get("/lookup")
+def get_public_keys(
+    request: Request,
+    user_ids: List[UUID] = Query(..., min_length=1, max_length=MAX_LOOKUP_IDS),
+    db: Session = Depends(get_db),
+):
+    """
+    Cacheable form of POST /lookup: ?user_ids=<id>&user_ids=<id>... The ETag
+    is built from the sorted key fingerprints, so revalidating a whole inbox
+    costs a 304 until one of its keys is rotated.
+    """
+    body = _lookup_keys(db, user_ids)
+    etag = make_etag(
+        sorted(f"{key['user_id']}:{key['fingerprint']}" for key in body["keys"])
+        + sorted(f"{user_id}:missing" for user_id in body["missing"])
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response = FastJSONResponse(body)
+    set_etag(response, etag)
+    return response
+
+@router.get("/{user_id}")
+def get_public_key(
+    user_id: UUID,
+    request: Request,
+    fingerprint: Optional[str] = Query(None, description="Pin the response to this key fingerprint"),
+    db: Session = Depends(get_db),
+):
+    payload = public_key_cache.get(user_id)
+    if payload is None:
+        key = db.query(PublicKey).filter(PublicKey.user_id == user_id).first()
+        if not key:
+            raise HTTPException(status_code=404, detail="Public key not found")
+        payload = _key_payload(key)
+        public_key_cache.set(user_id, payload)
+
+    if fingerprint is None:
+        # The user's current key can be rotated at any time: revalidate
+        cache_control = "no-cache"
+    elif fingerprint == payload["fingerprint"]:
+        # A fingerprint-pinned URL always names the same key bytes
+        cache_control = f"public, max-age={settings.PUBLIC_KEY_MAX_AGE_SECONDS}, immutable"
+    else:
+        raise HTTPException(status_code=404, detail="Public key fingerprint is not current")
+
+    etag = _key_etag(payload)
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    response = FastJSONResponse(payload)
+    set_etag(response, etag, cache_control)
+    return response
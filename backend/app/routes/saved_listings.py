@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from uuid import UUID
-from ..core.database import get_db
+from ..core.database import get_db, get_read_db
 from ..models.saved_listings import SavedListing  # you'll create this model soon
 from ..models.listing import Listing
 
@@ -26,7 +26,7 @@ def save_listing(user_id: UUID, listing_id: UUID, db: Session = Depends(get_db))
 from sqlalchemy.orm import selectinload
 
 @router.get("/saved-listings/")
-def get_saved_listings(user_id: UUID, db: Session = Depends(get_db)):
+def get_saved_listings(user_id: UUID, db: Session = Depends(get_read_db)):
     saved = (
         db.query(Listing)
         .join(SavedListing, SavedListing.listing_id == Listing.id)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID
 from enum import Enum
 from ..models.listing import PropertyType
@@ -15,6 +15,17 @@ class PropertyType(str, Enum):
     DUPLEX = "Duplex"
     ROOM = "Room"
 
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Listing dates are naive UTC columns; asyncpg refuses aware datetimes for them
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def check_availability(available_from: Optional[datetime], available_to: Optional[datetime]) -> None:
+    # tsrange() raises on a reversed window, so reject it before it reaches SQL
+    if available_from is not None and available_to is not None and available_from > available_to:
+        raise ValueError("available_from must not be after available_to")
+
 class ListingBase(BaseModel):
     title: str
     description: str
@@ -30,8 +41,18 @@ class ListingBase(BaseModel):
     host: Optional[str] = None
     amenities: Optional[str] = None
 
+    @field_validator("available_from", "available_to")
+    @classmethod
+    def dates_as_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return naive_utc(value)
+
+# Ordering is only checked on input: rows stored before it was enforced must
+# still serialize
 class ListingCreate(ListingBase):
-    pass
+    @model_validator(mode="after")
+    def availability_in_order(self):
+        check_availability(self.available_from, self.available_to)
+        return self
 
 class ListingImageBase(BaseModel):
     listing_id: UUID
@@ -51,6 +72,8 @@ class Listing(ListingBase):
     id: UUID
     user_id: UUID
     created_at: datetime
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     images: List[ListingImage] = []
 
     class Config:
@@ -71,14 +94,73 @@ class ListingUpdate(ListingBase):
     host: Optional[str] = None
     amenities: Optional[str] = None
 
+    @model_validator(mode="after")
+    def availability_in_order(self):
+        check_availability(self.available_from, self.available_to)
+        return self
+
 class ListingInDB(ListingBase):
     id: UUID
     user_id: UUID
     created_at: datetime
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     class Config:
         from_attributes = True
 
+def listing_payload(listing, **extra) -> dict:
+    """
+    JSON-ready ListingResponse body built straight from an ORM Listing with
+    `images` and `user` eager-loaded. The column types already match the
+    schema, so read paths can encode this without a validation pass.
+    """
+    user = listing.user
+    return {
+        "id": listing.id,
+        "title": listing.title,
+        "description": listing.description,
+        "price": listing.price,
+        "address": listing.address,
+        "city": listing.city,
+        "state": listing.state,
+        "property_type": listing.property_type,
+        "bedrooms": listing.bedrooms,
+        "bathrooms": listing.bathrooms,
+        "available_from": listing.available_from,
+        "available_to": listing.available_to,
+        "host": listing.host,
+        "amenities": listing.amenities,
+        "user_id": listing.user_id,
+        "created_at": listing.created_at,
+        "latitude": listing.latitude,
+        "longitude": listing.longitude,
+        "images": [
+            {
+                "listing_id": image.listing_id,
+                "image_url": image.image_url,
+                "id": image.id,
+                "created_at": image.created_at,
+            }
+            for image in listing.images
+        ],
+        "user": {
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+        },
+        **extra,
+    }
+
 class ListingResponse(ListingInDB):
     images: List[ListingImage] = []
-    user: dict 
\ No newline at end of file
+    user: dict
+
+    @classmethod
+    def from_listing(cls, listing, **extra):
+        return cls.model_validate(listing_payload(listing, **extra))
+
+class ListingSearchResult(ListingResponse):
+    # Only set for full-text (`q=`) searches
+    rank: Optional[float] = None
+    snippet: Optional[str] = None 
\ No newline at end of file
@@ -12,6 +12,25 @@ class MessageBase(BaseModel):
 class MessageCreate(MessageBase):
     timestamp: Optional[datetime] = None  # This will be set by the database
 
+def message_payload(obj) -> dict:
+    """
+    JSON-ready MessageOut body built straight from an ORM Message
+    """
+    # Ensure timestamp is always timezone-aware and in UTC
+    ts = obj.timestamp
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    else:
+        ts = ts.astimezone(timezone.utc)
+    return {
+        "content": obj.content,
+        "sender_id": str(obj.sender_id),
+        "receiver_id": str(obj.receiver_id),
+        "listing_id": str(obj.listing_id),
+        "id": str(obj.id),
+        "timestamp": ts,
+    }
+
 class MessageOut(MessageBase):
     id: str
     timestamp: datetime
@@ -23,20 +42,26 @@ class MessageOut(MessageBase):
 
     @classmethod
     def from_orm(cls, obj):
-        # Ensure timestamp is always timezone-aware and in UTC
-        ts = obj.timestamp
-        if ts.tzinfo is None:
-            ts = ts.replace(tzinfo=timezone.utc)
-        else:
-            ts = ts.astimezone(timezone.utc)
-        return cls(
-            id=str(obj.id),
-            content=obj.content,
-            sender_id=str(obj.sender_id),
-            receiver_id=str(obj.receiver_id),
-            listing_id=str(obj.listing_id),
-            timestamp=ts,
-        )
+        return cls(**message_payload(obj))
+
+MAX_BATCH_MESSAGES = 100
+
+class MessageBatchIn(BaseModel):
+    messages: List[MessageCreate] = Field(..., min_length=1, max_length=MAX_BATCH_MESSAGES)
+
+class MessageBatchItemOut(BaseModel):
+    index: int
+    conversation_id: str
+    message: MessageOut
+
+class MarkReadIn(BaseModel):
+    user_id: str = Field(..., description="UUID of the reader")
+    message_id: str = Field(..., description="UUID of the last message read")
+
+class ReadStateOut(BaseModel):
+    conversation_id: str
+    last_read_message_id: str
+    unreadCount: int
 
 class Participant(BaseModel):
     id: str
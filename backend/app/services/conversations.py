@@ -0,0 +1,220 @@
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.log import configure_logging, get_logger
+from ..models.conversation import Conversation, ConversationParticipant
+from ..models.message import Message
+
+logger = get_logger(__name__)
+
+
+def record_message(db: Session, message: Message) -> UUID:
+    """
+    Upsert the conversation a new message belongs to, and both participants'
+    rows, in the caller's transaction. The message must already be flushed.
+    Returns the conversation id.
+    """
+    return record_messages(db, [message])[message.id]
+
+
+def record_messages(db: Session, messages: List[Message]) -> Dict[UUID, UUID]:
+    """
+    Batch form of record_message: two upserts in total however many messages
+    there are. Returns conversation ids keyed by message id. Both upserts
+    write their rows in conflict-key order, so concurrent batches lock shared
+    rows in the same order and cannot deadlock.
+    """
+    # Postgres rejects an upsert that touches the same row twice, so collapse
+    # the batch to one row per conversation and per participant first
+    latest: Dict[Tuple[UUID, UUID, UUID], Message] = {}
+    unread: Dict[Tuple[UUID, UUID, UUID], Dict[UUID, int]] = defaultdict(dict)
+    for message in messages:
+        low_id, high_id = sorted([message.sender_id, message.receiver_id])
+        key = (message.listing_id, low_id, high_id)
+        current = latest.get(key)
+        if current is None or (message.timestamp, str(message.id)) > (current.timestamp, str(current.id)):
+            latest[key] = message
+        counts = unread[key]
+        counts.setdefault(message.sender_id, 0)
+        counts.setdefault(message.receiver_id, 0)
+        # Only the receiver gains an unread message
+        if message.receiver_id != message.sender_id:
+            counts[message.receiver_id] += 1
+
+    stmt = insert(Conversation).values([
+        {
+            "listing_id": listing_id,
+            "participant_low_id": low_id,
+            "participant_high_id": high_id,
+            "last_message_id": message.id,
+            "last_activity_at": message.timestamp,
+        }
+        for (listing_id, low_id, high_id), message in sorted(latest.items())
+    ])
+    # Timestamps are taken before the upsert waits on the row lock, so a
+    # concurrent send can commit first with a newer message; never move back
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_conversations_listing_participants",
+        set_={
+            "last_message_id": stmt.excluded.last_message_id,
+            "last_activity_at": stmt.excluded.last_activity_at,
+        },
+        where=stmt.excluded.last_activity_at >= Conversation.last_activity_at,
+    ).returning(
+        Conversation.id,
+        Conversation.listing_id,
+        Conversation.participant_low_id,
+        Conversation.participant_high_id,
+    )
+    conversation_ids = {
+        (row.listing_id, row.participant_low_id, row.participant_high_id): row.id
+        for row in db.execute(stmt)
+    }
+    # Rows the WHERE left untouched are not returned
+    missing = [key for key in latest if key not in conversation_ids]
+    if missing:
+        rows = db.query(
+            Conversation.id, Conversation.listing_id, Conversation.participant_low_id, Conversation.participant_high_id
+        ).filter(
+            tuple_(Conversation.listing_id, Conversation.participant_low_id, Conversation.participant_high_id).in_(missing)
+        )
+        conversation_ids.update(
+            ((row.listing_id, row.participant_low_id, row.participant_high_id), row.id) for row in rows
+        )
+
+    rows = []
+    for key, counts in unread.items():
+        low_id, high_id = key[1], key[2]
+        for user_id, unread_count in counts.items():
+            rows.append({
+                "conversation_id": conversation_ids[key],
+                "user_id": user_id,
+                "counterpart_id": high_id if user_id == low_id else low_id,
+                "last_activity_at": latest[key].timestamp,
+                "unread_count": unread_count,
+            })
+    rows.sort(key=lambda row: (row["conversation_id"], row["user_id"]))
+    stmt = insert(ConversationParticipant).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ConversationParticipant.conversation_id, ConversationParticipant.user_id],
+        set_={
+            # GREATEST(); CASE also runs on the SQLite test database
+            "last_activity_at": case(
+                (stmt.excluded.last_activity_at > ConversationParticipant.last_activity_at, stmt.excluded.last_activity_at),
+                else_=ConversationParticipant.last_activity_at,
+            ),
+            "unread_count": ConversationParticipant.unread_count + stmt.excluded.unread_count,
+        },
+    )
+    db.execute(stmt)
+
+    result = {}
+    for message in messages:
+        low_id, high_id = sorted([message.sender_id, message.receiver_id])
+        result[message.id] = conversation_ids[(message.listing_id, low_id, high_id)]
+    return result
+
+
+def mark_read(db: Session, user_id: UUID, message: Message) -> ConversationParticipant:
+    """
+    Move the user's read watermark in the message's conversation up to
+    `message` and recompute their unread count. The watermark never moves
+    backwards. Raises LookupError if the user is not in that conversation.
+    """
+    low_id, high_id = sorted([message.sender_id, message.receiver_id])
+    participant = (
+        db.query(ConversationParticipant)
+        .join(Conversation, Conversation.id == ConversationParticipant.conversation_id)
+        .filter(
+            Conversation.listing_id == message.listing_id,
+            Conversation.participant_low_id == low_id,
+            Conversation.participant_high_id == high_id,
+            ConversationParticipant.user_id == user_id,
+        )
+        .with_for_update(of=ConversationParticipant)
+        .first()
+    )
+    if participant is None:
+        raise LookupError("Conversation not found")
+
+    if participant.last_read_at is not None and (message.timestamp, str(message.id)) <= (
+        participant.last_read_at, str(participant.last_read_message_id)
+    ):
+        return participant
+
+    participant.last_read_message_id = message.id
+    participant.last_read_at = message.timestamp
+    if participant.conversation.last_message_id == message.id:
+        # Read up to the latest message: nothing left to count
+        participant.unread_count = 0
+    else:
+        # Only the tail of the conversation after the watermark is counted
+        participant.unread_count = (
+            db.query(Message)
+            .filter(
+                Message.listing_id == message.listing_id,
+                Message.sender_id == participant.counterpart_id,
+                Message.receiver_id == user_id,
+                Message.timestamp >= message.timestamp,  # partition pruning
+                tuple_(Message.timestamp, Message.id) > (message.timestamp, message.id),
+            )
+            .count()
+        )
+    return participant
+
+
+BACKFILL_CONVERSATIONS = text("""
+    INSERT INTO conversations (id, listing_id, participant_low_id, participant_high_id, last_message_id, last_activity_at, created_at)
+    SELECT DISTINCT ON (listing_id, LEAST(sender_id, receiver_id), GREATEST(sender_id, receiver_id))
+        gen_random_uuid(), listing_id, LEAST(sender_id, receiver_id), GREATEST(sender_id, receiver_id),
+        id, timestamp, now()
+    FROM messages
+    ORDER BY listing_id, LEAST(sender_id, receiver_id), GREATEST(sender_id, receiver_id), timestamp DESC, id DESC
+    ON CONFLICT ON CONSTRAINT uq_conversations_listing_participants DO UPDATE
+    SET last_message_id = excluded.last_message_id, last_activity_at = excluded.last_activity_at
+""")
+
+BACKFILL_PARTICIPANTS = text("""
+    INSERT INTO conversation_participants (conversation_id, user_id, counterpart_id, last_activity_at)
+    SELECT id, participant_low_id, participant_high_id, last_activity_at FROM conversations
+    UNION ALL
+    SELECT id, participant_high_id, participant_low_id, last_activity_at FROM conversations
+    WHERE participant_high_id <> participant_low_id
+    ON CONFLICT (conversation_id, user_id) DO UPDATE
+    SET last_activity_at = excluded.last_activity_at
+""")
+
+
+def backfill_conversations(db: Session) -> None:
+    """
+    Build or repair conversations from the full message history
+    """
+    db.execute(BACKFILL_CONVERSATIONS)
+    db.execute(BACKFILL_PARTICIPANTS)
+    db.commit()
+
+
+if __name__ == "__main__":
+    # python -m app.services.conversations --backfill
+    from ..core.database import SessionLocal
+    from ..models import listing, public_key, user  # noqa: F401  (resolve relationships)
+
+    parser = argparse.ArgumentParser(description="Maintain the conversations table")
+    parser.add_argument("--backfill", action="store_true", help="rebuild conversations from messages")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.print_help()
+    else:
+        configure_logging("__main__")
+        db = SessionLocal()
+        try:
+            backfill_conversations(db)
+            logger.info("conversations_backfilled")
+        finally:
+            db.close()
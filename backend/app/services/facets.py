@@ -0,0 +1,123 @@
+import argparse
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.log import configure_logging, get_logger
+from ..models.listing import Listing
+from ..models.listing_facet import ListingFacetCount
+
+logger = get_logger(__name__)
+
+FACETS = ("city", "property_type", "bedrooms", "price")
+
+# Upper bounds (exclusive) of the monthly price buckets; the last bucket is open
+PRICE_BUCKET_EDGES = (500, 750, 1000, 1250, 1500, 2000, 3000)
+
+FacetKey = Tuple[str, str]
+
+
+def price_bucket(price: float) -> str:
+    lower = 0
+    for upper in PRICE_BUCKET_EDGES:
+        if price < upper:
+            return f"{lower}-{upper}"
+        lower = upper
+    return f"{lower}+"
+
+
+def facet_values(listing) -> List[FacetKey]:
+    """
+    The (facet, value) pairs a listing counts towards. Works on ORM objects and
+    on plain rows, and tolerates the string values update_listing assigns from
+    form data.
+    """
+    return [
+        ("city", f"{listing.city.strip().title()}, {listing.state.strip().upper()}"),
+        ("property_type", str(getattr(listing.property_type, "value", listing.property_type))),
+        ("bedrooms", str(int(float(listing.bedrooms)))),
+        ("price", price_bucket(float(listing.price))),
+    ]
+
+
+def apply_facet_delta(db: Session, removed: Optional[List[FacetKey]] = None, added: Optional[List[FacetKey]] = None) -> None:
+    """
+    Adjust the counts in the caller's transaction; values present in both
+    lists cancel out, so unchanged listings cost no writes. Rows are written
+    in (facet, value) order so concurrent updates lock them in the same order
+    and cannot deadlock.
+    """
+    delta: Counter = Counter(added or [])
+    delta.subtract(removed or [])
+    rows = [
+        {"facet": facet, "value": value, "count": change}
+        for (facet, value), change in sorted(delta.items())
+        if change
+    ]
+    if not rows:
+        return
+    stmt = insert(ListingFacetCount).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ListingFacetCount.facet, ListingFacetCount.value],
+        set_={"count": ListingFacetCount.count + stmt.excluded.count},
+    )
+    db.execute(stmt)
+
+
+def get_facet_counts(db: Session) -> Dict[str, List[Dict]]:
+    counts: Dict[str, List[Dict]] = {facet: [] for facet in FACETS}
+    rows = (
+        db.query(ListingFacetCount)
+        .filter(ListingFacetCount.count > 0)
+        .order_by(ListingFacetCount.facet, ListingFacetCount.count.desc(), ListingFacetCount.value)
+        .all()
+    )
+    for row in rows:
+        counts.setdefault(row.facet, []).append({"value": row.value, "count": row.count})
+    return counts
+
+
+def rebuild_facets(db: Session, batch_size: int = 1000) -> int:
+    """
+    Recompute every count from the listings table, replacing the stored ones.
+    Returns the number of listings scanned.
+    """
+    totals: Counter = Counter()
+    scanned = 0
+    rows = db.query(
+        Listing.city, Listing.state, Listing.property_type, Listing.bedrooms, Listing.price
+    ).execution_options(yield_per=batch_size)
+    for row in rows:
+        totals.update(facet_values(row))
+        scanned += 1
+
+    db.query(ListingFacetCount).delete()
+    if totals:
+        db.bulk_insert_mappings(ListingFacetCount, [
+            {"facet": facet, "value": value, "count": count}
+            for (facet, value), count in totals.items()
+        ])
+    db.commit()
+    return scanned
+
+
+if __name__ == "__main__":
+    # python -m app.services.facets --rebuild
+    from ..core.database import SessionLocal
+    from ..models import message, public_key, user  # noqa: F401  (resolve Listing relationships)
+
+    parser = argparse.ArgumentParser(description="Maintain listing facet counts")
+    parser.add_argument("--rebuild", action="store_true", help="recompute all counts from listings")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+    else:
+        configure_logging("__main__")
+        db = SessionLocal()
+        try:
+            scanned = rebuild_facets(db)
+            logger.info("listing_facets_rebuilt", listings=scanned)
+        finally:
+            db.close()
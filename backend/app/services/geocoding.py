@@ -0,0 +1,102 @@
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from ..core.config import settings
+from ..core.log import get_logger
+
+logger = get_logger(__name__)
+
+Coordinates = Tuple[float, float]  # (latitude, longitude)
+
+# City centroids used by the offline geocoder. Good enough to place a listing
+# on the map and answer radius queries at campus scale.
+DEFAULT_CITY_TABLE: Dict[Tuple[str, str], Coordinates] = {
+    ("madison", "wi"): (43.0731, -89.4012),
+    ("ann arbor", "mi"): (42.2808, -83.7430),
+    ("berkeley", "ca"): (37.8715, -122.2730),
+    ("los angeles", "ca"): (34.0522, -118.2437),
+    ("austin", "tx"): (30.2672, -97.7431),
+    ("boston", "ma"): (42.3601, -71.0589),
+    ("cambridge", "ma"): (42.3736, -71.1097),
+    ("new york", "ny"): (40.7128, -74.0060),
+    ("chicago", "il"): (41.8781, -87.6298),
+    ("seattle", "wa"): (47.6062, -122.3321),
+    ("san francisco", "ca"): (37.7749, -122.4194),
+    ("miami", "fl"): (25.7617, -80.1918),
+    ("atlanta", "ga"): (33.7490, -84.3880),
+    ("champaign", "il"): (40.1164, -88.2434),
+    ("columbus", "oh"): (39.9612, -82.9988),
+    ("philadelphia", "pa"): (39.9526, -75.1652),
+}
+
+
+class Geocoder:
+    """
+    Resolves a listing address to coordinates. Returns None when the address
+    cannot be resolved; callers store the listing without a location.
+    """
+
+    def geocode(self, address: str, city: str, state: str) -> Optional[Coordinates]:
+        raise NotImplementedError
+
+
+class LocalGeocoder(Geocoder):
+    """
+    Offline geocoder backed by a (city, state) -> centroid table
+    """
+
+    def __init__(self, table: Optional[Dict[Tuple[str, str], Coordinates]] = None):
+        source = DEFAULT_CITY_TABLE if table is None else table
+        self.table = {(c.strip().lower(), s.strip().lower()): coords for (c, s), coords in source.items()}
+
+    def geocode(self, address: str, city: str, state: str) -> Optional[Coordinates]:
+        return self.table.get(((city or "").strip().lower(), (state or "").strip().lower()))
+
+
+class NominatimGeocoder(Geocoder):
+    """
+    Geocoder backed by an OpenStreetMap Nominatim server
+    """
+
+    def __init__(self, base_url: str = "https://nominatim.openstreetmap.org", timeout: float = 2.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def geocode(self, address: str, city: str, state: str) -> Optional[Coordinates]:
+        try:
+            response = httpx.get(
+                f"{self.base_url}/search",
+                params={"street": address, "city": city, "state": state, "format": "json", "limit": 1},
+                headers={"User-Agent": "LeaseLink/1.0"},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            results = response.json()
+            if not results:
+                return None
+            return float(results[0]["lat"]), float(results[0]["lon"])
+        except Exception as e:
+            logger.warning("geocoding_failed", city=city, state=state, error=str(e))
+            return None
+
+
+_geocoder: Optional[Geocoder] = None
+
+
+def get_geocoder() -> Geocoder:
+    global _geocoder
+    if _geocoder is None:
+        if settings.GEOCODER == "nominatim":
+            _geocoder = NominatimGeocoder(settings.NOMINATIM_URL)
+        else:
+            _geocoder = LocalGeocoder()
+    return _geocoder
+
+
+def set_geocoder(geocoder: Optional[Geocoder]) -> None:
+    """
+    Swap the process-wide geocoder, e.g. for a LocalGeocoder with a fixed table in tests
+    """
+    global _geocoder
+    _geocoder = geocoder
@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import gzip
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.log import configure_logging, get_logger
+from ..models.message import Message
+from ..schemas.message import message_payload
+
+logger = get_logger(__name__)
+
+# Serializes partition DDL between workers and the maintenance job
+PARTITION_LOCK_KEY = 0x6D736770
+ARCHIVE_BATCH_SIZE = 5000
+MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+
+MESSAGE_COLUMNS = "id, sender_id, receiver_id, listing_id, content, timestamp"
+PARTITION_NAME = re.compile(r"messages_y(\d{4})m(\d{2})")
+
+
+def month_start(value) -> date:
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"messages_y{month.year:04d}m{month.month:02d}"
+
+
+def archive_path(month: date, archive_dir: Optional[str] = None) -> str:
+    return os.path.join(archive_dir or settings.MESSAGE_ARCHIVE_DIR, f"{partition_name(month)}.ndjson.gz")
+
+
+def is_partitioned(db: Session) -> bool:
+    relkind = db.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('messages')")).scalar()
+    return relkind == "p"
+
+
+def list_partitions(db: Session) -> List[date]:
+    """
+    Months that currently have a partition attached to messages, oldest first
+    """
+    names = db.execute(text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'messages'::regclass
+    """)).scalars()
+    months = []
+    for name in names:
+        match = PARTITION_NAME.fullmatch(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def _lock(db: Session) -> None:
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+
+
+def _create_partition(db: Session, month: date) -> None:
+    # Bounds are UTC midnights; names and bounds only ever come from dates
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF messages "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    ))
+
+
+def _create_partitions(db: Session, first: date, last: date) -> List[date]:
+    existing = set(list_partitions(db))
+    created = []
+    month = first
+    while month <= last:
+        if month not in existing:
+            _create_partition(db, month)
+            created.append(month)
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_partitions(db: Session, months_ahead: Optional[int] = None) -> List[date]:
+    """
+    Create the partitions for this month and the next `months_ahead` months.
+    Returns the months that were created.
+    """
+    if months_ahead is None:
+        months_ahead = settings.MESSAGE_PARTITION_MONTHS_AHEAD
+    if not is_partitioned(db):
+        logger.warning("messages_not_partitioned", hint="run `python -m app.services.partitions --convert`")
+        return []
+    _lock(db)
+    current = month_start(datetime.now(timezone.utc))
+    created = _create_partitions(db, current, add_months(current, months_ahead))
+    db.commit()
+    return created
+
+
+def partition_existing_table(db: Session) -> int:
+    """
+    One-off conversion of a plain messages table into the partitioned layout,
+    copying every row across in one transaction. Returns the number of rows moved.
+    """
+    if is_partitioned(db):
+        return 0
+    _lock(db)
+    # A partitioned table cannot be the target of a foreign key on id alone
+    db.execute(text("ALTER TABLE conversations DROP CONSTRAINT IF EXISTS conversations_last_message_id_fkey"))
+    db.execute(text(
+        "ALTER TABLE conversation_participants "
+        "DROP CONSTRAINT IF EXISTS conversation_participants_last_read_message_id_fkey"
+    ))
+    db.execute(text("ALTER TABLE messages RENAME TO messages_unpartitioned"))
+    db.execute(text("ALTER TABLE messages_unpartitioned RENAME CONSTRAINT messages_pkey TO messages_unpartitioned_pkey"))
+    for index in Message.__table__.indexes:
+        db.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    Message.__table__.create(bind=db.connection())
+
+    first = db.execute(text("SELECT min(timestamp) FROM messages_unpartitioned")).scalar()
+    current = month_start(datetime.now(timezone.utc))
+    _create_partitions(
+        db, month_start(first) if first else current, add_months(current, settings.MESSAGE_PARTITION_MONTHS_AHEAD)
+    )
+    moved = db.execute(text(
+        f"INSERT INTO messages ({MESSAGE_COLUMNS}) SELECT {MESSAGE_COLUMNS} FROM messages_unpartitioned"
+    )).rowcount
+    db.execute(text("DROP TABLE messages_unpartitioned"))
+    db.commit()
+    return moved
+
+
+def archive_partition(db: Session, month: date, archive_dir: Optional[str] = None) -> int:
+    """
+    Write a month of messages to a gzip-compressed NDJSON archive (one MessageOut
+    object per line), then detach and drop its partition. The partition is only
+    dropped once the archive is complete on disk. Returns the number of rows archived.
+    """
+    name = partition_name(month)
+    path = archive_path(month, archive_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.partial"
+
+    _lock(db)
+    # Block writes to the month while it is copied out
+    db.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+    rows = db.execute(
+        text(f"SELECT {MESSAGE_COLUMNS} FROM {name} ORDER BY timestamp, id"),
+        execution_options={"yield_per": ARCHIVE_BATCH_SIZE},
+    )
+    count = 0
+    try:
+        with open(partial, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+                for row in rows:
+                    archive.write(orjson.dumps(message_payload(row), option=orjson.OPT_UTC_Z) + b"\n")
+                    count += 1
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(partial, path)
+    except Exception:
+        db.rollback()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+    db.execute(text(f"ALTER TABLE messages DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+    db.commit()
+    return count
+
+
+def archive_expired(db: Session, retention_months: Optional[int] = None, archive_dir: Optional[str] = None) -> List[date]:
+    """
+    Archive every partition that lies entirely before the retention window
+    """
+    if retention_months is None:
+        retention_months = settings.MESSAGE_RETENTION_MONTHS
+    cutoff = add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+    archived = []
+    for month in list_partitions(db):
+        if month < cutoff:
+            count = archive_partition(db, month, archive_dir)
+            logger.info("message_partition_archived", partition=partition_name(month), messages=count)
+            archived.append(month)
+    return archived
+
+
+def restore_partition(db: Session, month: date, archive_dir: Optional[str] = None) -> int:
+    """
+    Load an archived month back into its partition. Rows already present are
+    skipped, so a restore can be re-run safely. The archive file is kept; while
+    the month is still past retention, the next maintenance run archives it again.
+    """
+    path = archive_path(month, archive_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No archive for {partition_name(month)} at {path}")
+
+    _lock(db)
+    _create_partition(db, month)
+    stmt = insert(Message.__table__).on_conflict_do_nothing()
+    count = 0
+    batch = []
+    with gzip.open(path, "rb") as archive:
+        for line in archive:
+            record = orjson.loads(line)
+            batch.append({
+                "id": UUID(record["id"]),
+                "sender_id": UUID(record["sender_id"]),
+                "receiver_id": UUID(record["receiver_id"]),
+                "listing_id": UUID(record["listing_id"]),
+                "content": record["content"],
+                "timestamp": datetime.fromisoformat(record["timestamp"].replace("Z", "+00:00")),
+            })
+            if len(batch) >= ARCHIVE_BATCH_SIZE:
+                db.execute(stmt, batch)
+                count += len(batch)
+                batch = []
+    if batch:
+        db.execute(stmt, batch)
+        count += len(batch)
+    db.commit()
+    return count
+
+
+_maintenance_task: Optional[asyncio.Task] = None
+
+
+def _maintain_once() -> None:
+    from ..core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        created = ensure_partitions(db)
+        if created:
+            logger.info("message_partitions_created", partitions=[partition_name(month) for month in created])
+    except Exception:
+        db.rollback()
+        logger.exception("message_partition_maintenance_failed")
+    finally:
+        db.close()
+
+
+async def _maintenance_loop() -> None:
+    while True:
+        await asyncio.to_thread(_maintain_once)
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+
+
+async def start_partition_maintenance() -> None:
+    """
+    Keep future partitions in place for as long as the worker runs. Archival
+    is left to the --maintain job, which is run from cron.
+    """
+    global _maintenance_task
+    from ..core.database import engine
+
+    if engine.dialect.name == "postgresql":
+        _maintenance_task = asyncio.ensure_future(_maintenance_loop())
+
+
+async def stop_partition_maintenance() -> None:
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+
+
+def _parse_month(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+if __name__ == "__main__":
+    # python -m app.services.partitions --maintain
+    from ..core.database import SessionLocal
+    from ..models import listing, public_key, user  # noqa: F401  (resolve relationships)
+
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of the messages table")
+    parser.add_argument("--convert", action="store_true", help="partition an existing plain messages table")
+    parser.add_argument("--maintain", action="store_true", help="create future partitions and archive expired ones")
+    parser.add_argument("--list", action="store_true", help="list attached partitions")
+    parser.add_argument("--archive", type=_parse_month, metavar="YYYY-MM", help="archive and drop one month")
+    parser.add_argument("--restore", type=_parse_month, metavar="YYYY-MM", help="restore one month from its archive")
+    parser.add_argument("--archive-dir", default=None, help=f"default: {settings.MESSAGE_ARCHIVE_DIR}")
+    args = parser.parse_args()
+    if not (args.convert or args.maintain or args.list or args.archive or args.restore):
+        parser.print_help()
+    else:
+        configure_logging("__main__")
+        db = SessionLocal()
+        try:
+            if args.convert:
+                moved = partition_existing_table(db)
+                logger.info("messages_table_partitioned", moved=moved)
+            if args.maintain:
+                created = ensure_partitions(db)
+                archived = archive_expired(db, archive_dir=args.archive_dir)
+                logger.info("message_partitions_maintained", created=len(created), archived=len(archived))
+            if args.archive:
+                count = archive_partition(db, args.archive, args.archive_dir)
+                logger.info("message_partition_archived", partition=partition_name(args.archive), messages=count)
+            if args.restore:
+                count = restore_partition(db, args.restore, args.archive_dir)
+                logger.info("message_partition_restored", partition=partition_name(args.restore), messages=count)
+            if args.list:
+                for month in list_partitions(db):
+                    print(partition_name(month))
+        finally:
+            db.close()
@@ -0,0 +1,271 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+import orjson
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import engine
+from ..core.log import get_logger
+
+logger = get_logger(__name__)
+
+NOTIFY_CHANNEL = "message_events"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; larger messages are
+# sent by reference and loaded from the database by the receiving worker
+MAX_NOTIFY_PAYLOAD = 7500
+
+
+def encode_event(event_data: dict) -> str:
+    return orjson.dumps(event_data, option=orjson.OPT_UTC_Z).decode()
+
+
+class Subscriber:
+    """
+    One WebSocket connection. Events are buffered in a bounded queue; a client
+    that falls too far behind is marked overflowed and disconnected, and is
+    expected to reconnect and resume from the last message id it saw.
+    """
+
+    def __init__(self, user_id: UUID, max_queue: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+
+    def offer(self, event_data: dict) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event_data)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # Wake the sender loop so it can close the connection
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class ConnectionHub:
+    """
+    Per-worker registry of connected users. All methods run on the event loop,
+    except dispatch_threadsafe which may be called from request threads.
+    """
+
+    def __init__(self):
+        self.subscribers: Dict[UUID, Set[Subscriber]] = defaultdict(set)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, user_id: UUID) -> Subscriber:
+        subscriber = Subscriber(user_id, settings.REALTIME_MAX_QUEUE)
+        self.subscribers[user_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscribers = self.subscribers.get(subscriber.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.subscribers[subscriber.user_id]
+
+    def has_subscribers(self, *user_ids: UUID) -> bool:
+        return any(user_id in self.subscribers for user_id in user_ids)
+
+    def dispatch(self, event_data: dict) -> None:
+        message = event_data["message"]
+        recipients = {UUID(message["sender_id"]), UUID(message["receiver_id"])}
+        for user_id in recipients:
+            for subscriber in list(self.subscribers.get(user_id, ())):
+                subscriber.offer(event_data)
+
+    def dispatch_threadsafe(self, event_data: dict) -> None:
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.dispatch, event_data)
+
+
+hub = ConnectionHub()
+
+
+class FanoutBackend:
+    """
+    Delivers new-message events to the hubs of every worker. publish() is
+    called inside the create_message transaction, so events for rolled-back
+    messages are never delivered.
+    """
+
+    def publish(self, db: Session, message_event: dict) -> None:
+        raise NotImplementedError
+
+    def publish_many(self, db: Session, message_events: List[dict]) -> None:
+        for message_event in message_events:
+            self.publish(db, message_event)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class LocalFanout(FanoutBackend):
+    """
+    Single-worker delivery straight to this process's hub, after commit
+    """
+
+    def publish(self, db: Session, message_event: dict) -> None:
+        event.listen(db, "after_commit", lambda session: hub.dispatch_threadsafe(message_event), once=True)
+
+    def publish_many(self, db: Session, message_events: List[dict]) -> None:
+        def dispatch_all(session):
+            for message_event in message_events:
+                hub.dispatch_threadsafe(message_event)
+
+        event.listen(db, "after_commit", dispatch_all, once=True)
+
+
+class PostgresNotifyFanout(FanoutBackend):
+    """
+    Cross-worker delivery over Postgres LISTEN/NOTIFY. NOTIFY is transactional,
+    so the event is sent on commit; every worker, including the sending one,
+    receives it on a dedicated listening connection and feeds its own hub.
+    """
+
+    def __init__(self, channel: str = NOTIFY_CHANNEL):
+        self.channel = channel
+        self.connection = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def publish(self, db: Session, message_event: dict) -> None:
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": self.channel, "payload": self._payload(message_event)},
+        )
+
+    def publish_many(self, db: Session, message_events: List[dict]) -> None:
+        # One statement for the whole batch instead of a NOTIFY per message
+        db.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": self.channel, "payloads": [self._payload(e) for e in message_events]},
+        )
+
+    def _payload(self, message_event: dict) -> str:
+        payload = encode_event(message_event)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            message = message_event["message"]
+            payload = encode_event({
+                "type": "message_ref",
+                "message": {
+                    "id": message["id"],
+                    "sender_id": message["sender_id"],
+                    "receiver_id": message["receiver_id"],
+                },
+            })
+        return payload
+
+    async def start(self) -> None:
+        self._stopping = False
+        try:
+            await self._connect()
+        except Exception as e:
+            logger.error("message_listener_start_failed", channel=self.channel, error=str(e))
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        self._close()
+
+    async def _connect(self) -> None:
+        # psycopg2 connect/LISTEN are blocking; keep them off the event loop
+        self.connection = await asyncio.to_thread(self._open_listening_connection)
+        hub.loop.add_reader(self.connection.fileno(), self._on_readable)
+        logger.info("message_listener_started", channel=self.channel)
+
+    def _open_listening_connection(self):
+        # A connection taken out of the pool for good; it only ever LISTENs
+        pooled = engine.raw_connection()
+        pooled.detach()
+        connection = pooled.dbapi_connection
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel}")
+        return connection
+
+    def _close(self) -> None:
+        if self.connection is None:
+            return
+        try:
+            hub.loop.remove_reader(self.connection.fileno())
+        except Exception:
+            pass
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+
+    def _on_readable(self) -> None:
+        try:
+            self.connection.poll()
+        except Exception as e:
+            logger.error("message_listener_connection_lost", channel=self.channel, error=str(e))
+            self._close()
+            if not self._stopping:
+                self._reconnect_task = asyncio.ensure_future(self._reconnect())
+            return
+        while self.connection.notifies:
+            notification = self.connection.notifies.pop(0)
+            try:
+                asyncio.ensure_future(self._deliver(orjson.loads(notification.payload)))
+            except Exception as e:
+                logger.error("message_event_malformed", channel=self.channel, error=str(e))
+
+    async def _deliver(self, event_data: dict) -> None:
+        message = event_data["message"]
+        if not hub.has_subscribers(UUID(message["sender_id"]), UUID(message["receiver_id"])):
+            return
+        if event_data["type"] == "message_ref":
+            loaded = await asyncio.to_thread(load_message_payload, UUID(message["id"]))
+            if loaded is None:
+                return
+            event_data = {"type": "message", "message": loaded}
+        hub.dispatch(event_data)
+
+    async def _reconnect(self) -> None:
+        delay = 1.0
+        while not self._stopping:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+                return
+            except Exception as e:
+                logger.error("message_listener_reconnect_failed", channel=self.channel, retry_in=delay, error=str(e))
+                delay = min(delay * 2, 30.0)
+
+
+def load_message_payload(message_id: UUID) -> Optional[dict]:
+    from ..core.database import SessionLocal
+    from ..models.message import Message
+    from ..schemas.message import message_payload
+
+    db = SessionLocal()
+    try:
+        message = db.query(Message).filter(Message.id == message_id).first()
+        return message_payload(message) if message else None
+    finally:
+        db.close()
+
+
+fanout: FanoutBackend = PostgresNotifyFanout() if settings.REALTIME_BACKEND == "postgres" else LocalFanout()
+
+
+async def start_realtime() -> None:
+    hub.loop = asyncio.get_running_loop()
+    await fanout.start()
+
+
+async def stop_realtime() -> None:
+    await fanout.stop()
@@ -0,0 +1,39 @@
+"""
+Micro-benchmarks behind the numbers quoted in performance commits. Run from
+backend/ with the dev requirements installed, e.g.
+
+    python -m bench.serialization
+    python -m bench.logging_overhead
+    python -m bench.async_sessions
+
+Like the tests, they run against a temporary SQLite database unless
+DATABASE_URL is already set; none of them needs a running server.
+"""
+import os
+import tempfile
+import timeit
+from typing import Callable
+
+_TMP_DIR = tempfile.mkdtemp(prefix="subletmatch-bench-")
+
+# Settings are read at import time, so the environment is fixed before app imports
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TMP_DIR}/bench.db")
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["REALTIME_BACKEND"] = "local"
+os.environ["GEOCODER"] = "local"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("DB_SLOW_QUERY_MS", "0")  # the slow-query log would time itself
+for name in (
+    "AWS_SECRET_ACCESS_KEY", "AWS_ACCESS_KEY_ID", "AWS_DEFAULT_REGION", "SENDGRID_API_KEY", "SENDGRID_FROM_EMAIL",
+    "PROD_HOST", "PROD_DB", "PROD_USER", "PROD_PASSWORD", "LOCAL_HOST", "LOCAL_DB", "LOCAL_USER", "LOCAL_PASSWORD",
+    "FRONTEND_URL", "S3_BUCKET_NAME",
+):
+    os.environ.setdefault(name, "bench")
+os.environ.setdefault("APP_ENV", "bench")
+
+
+def best_seconds(fn: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """
+    Fastest mean time of one `fn()` call over `repeat` runs of `number` calls
+    """
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
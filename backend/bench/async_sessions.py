@@ -0,0 +1,115 @@
+"""
+Latency of fast requests while slow ones are in flight, with handlers on the
+sync Session versus AsyncSession:
+
+    python -m bench.async_sessions [--slow 4] [--fast 100] [--duration 2]
+
+Each variant gets a "slow" handler (a query of about --slow-seconds) and a
+"fast" one (a single-row select), both async def. The sync variant is the old
+pattern: a blocking Session inside async def, which freezes the event loop for
+every round trip. Load is open-loop: the requests are spread at random over
+--duration seconds whether or not earlier ones have finished. Requests go
+through httpx's ASGITransport, so no server or network is involved.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+# First: sets up the environment the app settings are read from
+from bench import best_seconds
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal, SessionLocal, async_engine
+
+SLOW_SQL = text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) SELECT count(*) FROM c")
+FAST_SQL = text("SELECT 1")
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync/{kind}")
+async def sync_session(kind: str, n: int = 1):
+    db = SessionLocal()
+    try:
+        return {"value": db.execute(SLOW_SQL if kind == "slow" else FAST_SQL, {"n": n}).scalar()}
+    finally:
+        db.close()
+
+
+@bench_app.get("/async/{kind}")
+async def async_session(kind: str, n: int = 1):
+    async with AsyncSessionLocal() as db:
+        return {"value": (await db.execute(SLOW_SQL if kind == "slow" else FAST_SQL, {"n": n})).scalar()}
+
+
+def calibrate(seconds: float) -> int:
+    # Recursion depth that makes SLOW_SQL take about `seconds`
+    n = 10000
+    with SessionLocal() as db:
+        per_step = best_seconds(lambda: db.execute(SLOW_SQL, {"n": n}).scalar(), number=1, repeat=3) / n
+    return max(1, int(seconds / per_step))
+
+
+async def run(variant: str, slow: int, fast: int, duration: float, n: int, timeout: float) -> str:
+    rng = random.Random(0)
+    schedule = [("slow", rng.uniform(0, duration)) for _ in range(slow)]
+    schedule += [("fast", rng.uniform(0, duration)) for _ in range(fast)]
+    transport = httpx.ASGITransport(app=bench_app)
+    fast_latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+        start = time.perf_counter()
+
+        async def fire(kind: str, at: float):
+            nonlocal errors
+            await asyncio.sleep(max(0.0, at - (time.perf_counter() - start)))
+            # From the scheduled time: a blocked event loop delays the send too
+            sent = start + at
+            try:
+                response = await client.get(f"/{variant}/{kind}", params={"n": n if kind == "slow" else 1})
+                response.raise_for_status()
+            except Exception:
+                errors += 1
+                return
+            if kind == "fast":
+                fast_latencies.append(time.perf_counter() - sent)
+
+        try:
+            await asyncio.wait_for(asyncio.gather(*(fire(kind, at) for kind, at in schedule)), timeout)
+        except asyncio.TimeoutError:
+            return f"stalled: {len(fast_latencies)}/{fast} fast requests finished within {timeout:.0f} s"
+        finally:
+            # Pooled connections belong to this run's event loop
+            await async_engine.dispose()
+
+    if not fast_latencies:
+        return f"no fast request succeeded ({errors} errors)"
+    ms = sorted(latency * 1000 for latency in fast_latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    result = f"fast p50 {statistics.median(ms):6.1f} ms, p95 {p95:6.1f} ms, max {ms[-1]:6.1f} ms"
+    return result + (f", {errors} errors" if errors else "")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slow", type=int, default=4, help="slow requests")
+    parser.add_argument("--fast", type=int, default=100, help="fast requests")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds the requests are spread over")
+    parser.add_argument("--slow-seconds", type=float, default=0.3, help="target duration of one slow query")
+    parser.add_argument("--timeout", type=float, default=60.0, help="give up on a variant after this many seconds")
+    args = parser.parse_args()
+
+    n = calibrate(args.slow_seconds)
+    print(f"{args.slow} slow and {args.fast} fast requests over {args.duration:.0f} s")
+    for variant, label in (("sync", "sync session"), ("async", "AsyncSession")):
+        print(f"  {label + ':':<14}", asyncio.run(run(variant, args.slow, args.fast, args.duration, n, args.timeout)))
+
+
+if __name__ == "__main__":
+    main()
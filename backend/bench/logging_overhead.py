@@ -0,0 +1,80 @@
+"""
+Logging cost of one create_message request, written to an in-memory stream:
+
+    python -m bench.logging_overhead
+
+before: the eight f-string INFO lines create_message used to emit
+after:  the structured logger's sampled message_created event (plus the
+        payload dump call, a no-op without LOG_PAYLOADS), at several sample
+        rates and with INFO disabled
+"""
+import io
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+
+# First: sets up the environment the app settings are read from
+from bench import best_seconds
+
+from app.core.config import settings
+from app.core.log import JsonFormatter, get_logger
+from app.schemas.message import MessageCreate
+
+NUMBER = 20000
+
+
+def report(label: str, fn) -> None:
+    print(f"{label + ':':<34}{best_seconds(fn, NUMBER) * 1e6:6.1f} us")
+
+
+def _stream_logger(name: str, formatter: logging.Formatter) -> logging.Logger:
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(formatter)
+    stdlib_logger = logging.getLogger(name)
+    stdlib_logger.handlers[:] = [handler]
+    stdlib_logger.propagate = False
+    return stdlib_logger
+
+
+def main() -> None:
+    message = MessageCreate(
+        content="Is the room still available?", sender_id=str(uuid.uuid4()),
+        receiver_id=str(uuid.uuid4()), listing_id=str(uuid.uuid4()),
+    )
+    message_id, timestamp = uuid.uuid4(), datetime.now(timezone.utc)
+
+    old_logger = _stream_logger("bench.before", logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    def before():
+        old_logger.info(f"Raw message data: {json.dumps(message.model_dump(), default=str)}")
+        old_logger.info(f"Content: {message.content}")
+        old_logger.info(f"Sender ID: {message.sender_id} (type: {type(message.sender_id)})")
+        old_logger.info(f"Receiver ID: {message.receiver_id} (type: {type(message.receiver_id)})")
+        old_logger.info(f"Listing ID: {message.listing_id} (type: {type(message.listing_id)})")
+        old_logger.info("Successfully converted all IDs to UUIDs")
+        old_logger.info(f"Returning message with timestamp: {timestamp} (type: {type(timestamp)})")
+        old_logger.info(f"Successfully created message with ID: {message_id}")
+
+    new_stdlib_logger = _stream_logger("bench.after", JsonFormatter())
+    logger = get_logger("bench.after")
+
+    def after():
+        logger.payload("message_create_payload", message.model_dump, route="create_message")
+        logger.info(
+            "message_created", route="create_message", message_id=message_id,
+            listing_id=message.listing_id, sender_id=message.sender_id, receiver_id=message.receiver_id,
+        )
+
+    old_logger.setLevel(logging.INFO)
+    report("before (8 f-string INFO lines)", before)
+    new_stdlib_logger.setLevel(logging.INFO)
+    for rate in (1.0, settings.LOG_SAMPLE_RATES["create_message"], 0.01):
+        settings.LOG_SAMPLE_RATES = {**settings.LOG_SAMPLE_RATES, "create_message": rate}
+        report(f"after, sample rate {rate}", after)
+    new_stdlib_logger.setLevel(logging.WARNING)
+    report("after, LOG_LEVEL=WARNING", after)
+
+
+if __name__ == "__main__":
+    main()
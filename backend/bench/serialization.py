@@ -0,0 +1,110 @@
+"""
+Per-item cost of turning ORM rows into response bytes, for a page of listings
+and a page of messages:
+
+    python -m bench.serialization [--rows 100]
+
+before: build the response model from the row, then let FastAPI validate the
+        page against response_model again and encode it with JSONResponse
+after:  listing_payload / message_payload encoded by FastJSONResponse
+
+Both paths must produce the same JSON; the script checks that first.
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# First: sets up the environment the app settings are read from
+from bench import best_seconds
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+import app.main  # noqa: F401  (resolve model relationships)
+from app.core.responses import FastJSONResponse
+from app.models.listing import Listing, ListingImage
+from app.models.message import Message
+from app.models.user import User
+from app.schemas.listing import ListingResponse, listing_payload
+from app.schemas.message import MessageOut, message_payload
+
+
+def make_listings(count: int) -> List[Listing]:
+    owner = User(id=uuid.uuid4(), name="Host", email="host@example.com")
+    start = datetime(2026, 1, 1)
+    listings = []
+    for index in range(count):
+        listing = Listing(
+            id=uuid.uuid4(), title=f"Furnished room {index}", description="Close to campus. " * 20,
+            price=500.0 + index, address=f"{index} Main St", city="Madison", state="WI",
+            property_type="Apartment", bedrooms=1 + index % 3, bathrooms=1.0,
+            available_from=datetime(2026, 5, 1), available_to=datetime(2026, 8, 31),
+            host="Host", amenities="wifi, laundry", user_id=owner.id, user=owner,
+            created_at=start + timedelta(minutes=index), latitude=43.07, longitude=-89.4,
+        )
+        listing.images = [
+            ListingImage(
+                id=uuid.uuid4(), listing_id=listing.id, created_at=start,
+                image_url=f"https://images.example.com/{listing.id}/{n}.jpg",
+            )
+            for n in range(3)
+        ]
+        listings.append(listing)
+    return listings
+
+
+def make_messages(count: int) -> List[Message]:
+    sender, receiver, listing = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    return [
+        Message(
+            id=uuid.uuid4(), sender_id=sender, receiver_id=receiver, listing_id=listing,
+            content=f"Is the room still available? ({index})", timestamp=start + timedelta(seconds=index),
+        )
+        for index in range(count)
+    ]
+
+
+def encode_through_fastapi(loop, response_type, items) -> bytes:
+    # What a route returning models with response_model set used to go through
+    field = create_model_field("Response_bench", response_type, mode="serialization")
+    content = loop.run_until_complete(serialize_response(field=field, response_content=items))
+    return JSONResponse(content).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="rows per encoded page")
+    args = parser.parse_args()
+    loop = asyncio.new_event_loop()
+
+    cases = {
+        "listing": (
+            make_listings(args.rows), List[ListingResponse],
+            lambda rows: [ListingResponse.from_listing(row) for row in rows], listing_payload,
+        ),
+        "message": (
+            make_messages(args.rows), List[MessageOut],
+            lambda rows: [MessageOut.from_orm(row) for row in rows], message_payload,
+        ),
+    }
+    for name, (rows, response_type, build_models, build_payload) in cases.items():
+        def before():
+            return encode_through_fastapi(loop, response_type, build_models(rows))
+
+        def after():
+            return FastJSONResponse([build_payload(row) for row in rows]).body
+
+        if orjson.loads(before()) != orjson.loads(after()):
+            raise SystemExit(f"{name}: the two encodings differ")
+        before_us = best_seconds(before, number=20) / len(rows) * 1e6
+        after_us = best_seconds(after, number=20) / len(rows) * 1e6
+        print(f"{name}: {before_us:.1f}us before, {after_us:.1f}us after per item ({len(rows)} rows)")
+
+
+if __name__ == "__main__":
+    main()
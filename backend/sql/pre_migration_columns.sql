@@ -0,0 +1,24 @@
+-- Columns that versions of the app from before Alembic migrations expect but
+-- never added to existing tables (create_all only creates missing tables).
+-- Safe to run any number of times, on any of those versions' databases:
+--
+--   psql "$DATABASE_URL" -f sql/pre_migration_columns.sql
+--
+-- Migrations 0002, 0004 and 0005 add the same columns idempotently, so a
+-- database patched with this script still upgrades with `alembic upgrade head`.
+
+-- Listing coordinates (geocoded search) and row versions (ETags)
+ALTER TABLE listings ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE listings ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+ALTER TABLE listings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE;
+
+-- Per-user read watermarks, added after the conversations tables
+ALTER TABLE IF EXISTS conversation_participants ADD COLUMN IF NOT EXISTS last_read_message_id UUID;
+ALTER TABLE IF EXISTS conversation_participants ADD COLUMN IF NOT EXISTS last_read_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE IF EXISTS conversation_participants ADD COLUMN IF NOT EXISTS unread_count INTEGER DEFAULT 0 NOT NULL;
+
+-- Public key fingerprints and versions
+ALTER TABLE public_keys ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64);
+ALTER TABLE public_keys ADD COLUMN IF NOT EXISTS version INTEGER DEFAULT 1 NOT NULL;
+ALTER TABLE public_keys ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE;
+UPDATE public_keys SET fingerprint = encode(sha256(convert_to(public_key, 'UTF8')), 'hex') WHERE fingerprint IS NULL;
@@ -0,0 +1,155 @@
+"""
+Tests run against TEST_DATABASE_URL when it is set (a throwaway Postgres
+database: its public schema is dropped and rebuilt with `alembic upgrade head`),
+otherwise against a temporary SQLite file with the Postgres-only indexes left out.
+"""
+import os
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="subletmatch-tests-")
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{_TMP_DIR}/test.db"
+
+# Settings are read at import time, so the environment is fixed before app imports
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["REALTIME_BACKEND"] = "local"
+os.environ["GEOCODER"] = "local"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+for name in (
+    "AWS_SECRET_ACCESS_KEY", "AWS_ACCESS_KEY_ID", "AWS_DEFAULT_REGION", "SENDGRID_API_KEY", "SENDGRID_FROM_EMAIL",
+    "PROD_HOST", "PROD_DB", "PROD_USER", "PROD_PASSWORD", "LOCAL_HOST", "LOCAL_DB", "LOCAL_USER", "LOCAL_PASSWORD",
+    "FRONTEND_URL", "S3_BUCKET_NAME",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("APP_ENV", "test")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.auth.utils import create_access_token  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.listing import Listing, ListingImage  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+IS_POSTGRES = engine.dialect.name == "postgresql"
+
+
+
+def pytest_collection_modifyitems(config, items):
+    # @pytest.mark.postgres_only tests exercise the planner, indexes or SQL SQLite lacks
+    if IS_POSTGRES:
+        return
+    skip = pytest.mark.skip(reason="needs TEST_DATABASE_URL pointing at Postgres")
+    for item in items:
+        if "postgres_only" in item.keywords:
+            item.add_marker(skip)
+
+
+def _create_postgres_schema() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    config = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(os.path.dirname(__file__), "..", "alembic"))
+    command.upgrade(config, "head")
+
+    # Message fixtures are dated from January 2026; migrations only create
+    # partitions from the current month on
+    from app.services.partitions import _create_partitions, month_start
+
+    with SessionLocal() as session:
+        _create_partitions(session, date(2026, 1, 1), month_start(datetime.now(timezone.utc)))
+        session.commit()
+
+
+def _create_sqlite_schema() -> None:
+    # GiST/GIN and function indexes (tsrange, point, to_tsvector) do not exist in SQLite
+    for table in Base.metadata.tables.values():
+        for index in list(table.indexes):
+            if index.dialect_options["postgresql"].get("using") or any(
+                not hasattr(expression, "name") for expression in index.expressions
+            ):
+                table.indexes.discard(index)
+    Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    if IS_POSTGRES:
+        _create_postgres_schema()
+    else:
+        _create_sqlite_schema()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def user(db):
+    host = User(email=f"{uuid.uuid4()}@example.com", name="Test Host", password_hash="x", is_verified=True)
+    db.add(host)
+    db.commit()
+    return host
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+
+@pytest.fixture
+def make_listings(db, user):
+    """
+    make_listings(count, **fields): `count` listings with one image each, newest last
+    """
+
+    def make(count: int, **fields):
+        start = datetime(2026, 1, 1)
+        listings = []
+        for index in range(count):
+            values = {
+                "title": f"Furnished room {index}",
+                "description": "Close to campus",
+                "price": 500 + index,
+                "address": f"{index} Main St",
+                "city": "Madison",
+                "state": "WI",
+                "property_type": "Apartment",
+                "bedrooms": 1 + index % 3,
+                "bathrooms": 1,
+                "available_from": datetime(2026, 5, 1),
+                "available_to": datetime(2026, 8, 31),
+                "created_at": start + timedelta(minutes=index),
+                "user_id": user.id,
+                **fields,
+            }
+            listing = Listing(**values)
+            db.add(listing)
+            db.flush()
+            db.add(ListingImage(listing_id=listing.id, image_url=f"https://images.example.com/{listing.id}.jpg"))
+            listings.append(listing)
+        db.commit()
+        return listings
+
+    return make
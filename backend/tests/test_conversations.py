@@ -0,0 +1,81 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert
+
+from app.models.conversation import Conversation, ConversationParticipant
+from app.models.message import Message
+from app.models.user import User
+from app.services.conversations import record_message, record_messages
+
+
+def _utc(value):
+    # SQLite hands timestamps back naive
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _message(db, sender, receiver, listing, timestamp):
+    message = Message(
+        sender_id=sender.id, receiver_id=receiver.id, listing_id=listing.id, content="hi", timestamp=timestamp
+    )
+    db.add(message)
+    db.flush()
+    return message
+
+
+def test_older_message_committed_last_does_not_rewind_conversation(db, user, make_listings):
+    listing = make_listings(1)[0]
+    guest = User(email=f"{uuid.uuid4()}@example.com")
+    db.add(guest)
+    db.flush()
+    sent_at = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+    # The later message wins the row lock and commits first
+    newer_at = sent_at + timedelta(seconds=1)
+    newer = _message(db, guest, user, listing, newer_at)
+    record_message(db, newer)
+    older = _message(db, guest, user, listing, sent_at)
+    conversation_id = record_message(db, older)
+    db.commit()
+
+    conversation = db.get(Conversation, conversation_id)
+    assert conversation.last_message_id == newer.id
+    host_side = db.get(ConversationParticipant, (conversation_id, user.id))
+    guest_side = db.get(ConversationParticipant, (conversation_id, guest.id))
+    for participant in (host_side, guest_side):
+        assert _utc(participant.last_activity_at) == newer_at
+    # Every message still counts as unread
+    assert host_side.unread_count == 2
+    assert guest_side.unread_count == 0
+
+
+def _upserted_rows(statement, columns):
+    # Multi-row VALUES compile to <column>_m<row> parameters
+    params = statement.compile(dialect=postgresql.dialect()).params
+    count = sum(1 for name in params if name.startswith(f"{columns[0]}_m"))
+    return [tuple(params[f"{column}_m{i}"] for column in columns) for i in range(count)]
+
+
+def test_batch_upserts_rows_in_conflict_key_order(db, user, make_listings):
+    listings = make_listings(3)
+    guests = [User(email=f"{uuid.uuid4()}@example.com") for _ in range(3)]
+    db.add_all(guests)
+    db.flush()
+    sent_at = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    pairs = [(guest, listing) for guest in guests for listing in listings]
+    messages = [
+        _message(db, guest, user, listing, sent_at + timedelta(seconds=i))
+        for i, (guest, listing) in enumerate(reversed(pairs))
+    ]
+
+    with mock.patch.object(db, "execute", wraps=db.execute) as execute:
+        record_messages(db, messages)
+    conversations, participants = [
+        call.args[0] for call in execute.call_args_list if isinstance(call.args[0], Insert)
+    ]
+    conversation_keys = _upserted_rows(conversations, ("listing_id", "participant_low_id", "participant_high_id"))
+    participant_keys = _upserted_rows(participants, ("conversation_id", "user_id"))
+    assert len(conversation_keys) == 9 and conversation_keys == sorted(conversation_keys)
+    assert len(participant_keys) == 18 and participant_keys == sorted(participant_keys)
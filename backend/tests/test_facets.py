@@ -0,0 +1,23 @@
+from sqlalchemy.dialects import postgresql
+
+from app.services.facets import apply_facet_delta
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+
+def test_facet_delta_rows_are_written_in_key_order():
+    db = RecordingSession()
+    apply_facet_delta(
+        db,
+        removed=[("price", "750-1000"), ("city", "Madison, WI"), ("bedrooms", "2")],
+        added=[("price", "500-750"), ("city", "Madison, WI"), ("bedrooms", "1")],
+    )
+    params = db.statements[0].compile(dialect=postgresql.dialect()).params
+    rows = [(params[f"facet_m{i}"], params[f"value_m{i}"]) for i in range(4)]
+    assert rows == [("bedrooms", "1"), ("bedrooms", "2"), ("price", "500-750"), ("price", "750-1000")]
@@ -0,0 +1,42 @@
+"""
+The search filters must reach their composite indexes. Sequential scans are
+disabled so the planner's choice does not depend on the table's size.
+"""
+import pytest
+from sqlalchemy import func, select, text
+
+from app.models.listing import Listing
+
+pytestmark = pytest.mark.postgres_only
+
+
+def _plan(db, query) -> str:
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    sql = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    return "\n".join(row[0] for row in db.execute(text(f"EXPLAIN {sql}")))
+
+
+@pytest.fixture
+def analyzed(db, make_listings):
+    make_listings(50)
+    db.execute(text("ANALYZE listings"))
+    db.commit()
+
+
+def test_state_and_city_filter_uses_state_city_price_index(db, analyzed):
+    # The same expressions search_listings filters on
+    query = select(Listing.id).where(
+        func.lower(Listing.state) == "wi",
+        func.lower(Listing.city) == "madison",
+        Listing.price <= 520,
+    )
+    assert "ix_listings_state_city_price" in _plan(db, query)
+
+
+def test_property_type_and_price_filter_uses_property_type_price_index(db, analyzed):
+    query = select(Listing.id).where(
+        Listing.property_type == "Apartment",
+        Listing.price >= 510,
+        Listing.price <= 530,
+    )
+    assert "ix_listings_property_type_price" in _plan(db, query)
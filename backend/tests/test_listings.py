@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.models.listing import Listing
+from app.routes import listings
+from app.routes.listings import _apply_listing_update
+from app.schemas.listing import ListingCreate, ListingResponse
+
+LISTING = {
+    "title": "Sunny studio",
+    "description": "Walk to campus",
+    "price": 950,
+    "address": "1 State St",
+    "city": "Madison",
+    "state": "WI",
+    "property_type": "Studio",
+    "bedrooms": 1,
+    "bathrooms": 1,
+}
+
+
+def test_listing_dates_are_stored_as_naive_utc():
+    listing = ListingCreate(
+        **LISTING, available_from="2026-05-01T02:00:00+02:00", available_to="2026-08-31T00:00:00.000Z"
+    )
+    assert listing.available_from.isoformat() == "2026-05-01T00:00:00"
+    assert listing.available_to.isoformat() == "2026-08-31T00:00:00"
+
+
+def test_create_listing_with_utc_z_dates(client, auth_headers):
+    # What the frontend sends: Date.prototype.toISOString()
+    response = client.post(
+        "/api/v1/listings/create",
+        json={**LISTING, "available_from": "2026-05-01T00:00:00.000Z", "available_to": "2026-08-31T00:00:00.000Z"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["available_from"] == "2026-05-01T00:00:00"
+    assert body["available_to"] == "2026-08-31T00:00:00"
+
+
+def test_reversed_availability_is_rejected_on_create(client, auth_headers):
+    response = client.post(
+        "/api/v1/listings/create",
+        json={**LISTING, "available_from": "2026-08-31T00:00:00Z", "available_to": "2026-05-01T00:00:00Z"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
+    assert "available_from must not be after available_to" in response.text
+
+
+def test_reversed_availability_is_rejected_on_search(client):
+    response = client.get(
+        "/api/v1/listings/search",
+        params={"available_from": "2026-08-31T00:00:00Z", "available_to": "2026-05-01T00:00:00"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "available_from must not be after available_to"
+
+
+def test_reversed_availability_is_rejected_on_update(db, user, make_listings):
+    # Called directly: SQLite cannot bind the route's string id to a UUID column.
+    # The stored window is 2026-05-01 to 2026-08-31 and only one end is submitted.
+    listing = make_listings(1)[0]
+    with pytest.raises(HTTPException) as rejected:
+        _apply_listing_update(db, listing.id, user.id, {"available_to": "2026-04-01T00:00:00Z"})
+    assert rejected.value.status_code == 400
+    assert rejected.value.detail == "available_from must not be after available_to"
+
+    updated = _apply_listing_update(db, listing.id, user.id, {"available_to": "2026-09-30T00:00:00Z"})
+    assert updated.available_to.isoformat() == "2026-09-30T00:00:00"
+
+
+@pytest.mark.parametrize("page_size", [1, 10, 100])
+def test_feed_query_count_does_not_grow_with_page_size(client, make_listings, monkeypatch, page_size):
+    # X-DB-Queries is the RequestQueryStats count the instrumentation middleware keeps
+    monkeypatch.setattr(settings, "APP_ENV", "dev")
+    make_listings(100)
+    response = client.get("/api/v1/listings/", params={"limit": page_size})
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == page_size
+    # The page with its owners joined in, then one selectin query for the images
+    assert response.headers["X-DB-Queries"] == "2"
+
+
+def test_stored_reversed_availability_still_serializes(user):
+    # Rows written before the ordering was enforced; built in memory because
+    # the availability index refuses them on Postgres
+    listing = Listing(
+        **LISTING, id=uuid.uuid4(), user_id=user.id, user=user, images=[], created_at=datetime(2026, 1, 1),
+        available_from=datetime(2026, 8, 31), available_to=datetime(2026, 5, 1),
+    )
+    assert ListingResponse.from_listing(listing).available_from.isoformat() == "2026-08-31T00:00:00"
+
+
+def test_missing_listing_is_a_404_without_an_error_log(client):
+    with mock.patch.object(listings.logger, "exception") as log_exception:
+        response = client.get(f"/api/v1/listings/{uuid.uuid4()}")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Listing not found"
+    log_exception.assert_not_called()
@@ -0,0 +1,132 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app.core.config import settings
+from app.models.message import Message
+from app.models.user import User
+from app.routes.message import get_conversation
+
+
+def test_sse_replays_the_whole_backlog_a_page_at_a_time(client, db, user, make_listings):
+    listing = make_listings(1)[0]
+    guest = User(email=f"{uuid.uuid4()}@example.com")
+    db.add(guest)
+    db.flush()
+    sent_at = datetime(2026, 3, 1, 12, 0)
+    messages = [
+        Message(
+            sender_id=guest.id, receiver_id=user.id, listing_id=listing.id, content=f"hi {i}",
+            timestamp=sent_at + timedelta(seconds=i),
+        )
+        for i in range(7)
+    ]
+    db.add_all(messages)
+    db.commit()
+
+    with client.stream(
+        "GET", f"/api/v1/messages/user/{user.id}/since",
+        params={"since": "2026-03-01T00:00:00Z", "mode": "sse", "wait": 1, "limit": 3},
+    ) as response:
+        body = "".join(response.iter_text())
+    event_ids = [line[len("id: "):] for line in body.splitlines() if line.startswith("id: ")]
+    assert event_ids == [str(message.id) for message in messages]
+
+
+
+def test_websocket_resume_replays_the_whole_backlog(client, db, user, make_listings, monkeypatch):
+    monkeypatch.setattr(settings, "REALTIME_RESUME_LIMIT", 2)
+    monkeypatch.setattr(settings, "REALTIME_HEARTBEAT_SECONDS", 1)
+    listing = make_listings(1)[0]
+    guest = User(email=f"{uuid.uuid4()}@example.com")
+    db.add(guest)
+    db.flush()
+    messages = _conversation(db, user, guest, listing, 6)
+
+    with client.websocket_connect(f"/api/v1/messages/ws/{user.id}?last_id={messages[0].id}") as websocket:
+        replayed = [websocket.receive_json()["message"]["id"] for _ in messages[1:]]
+    assert replayed == [str(m.id) for m in messages[1:]]
+
+def _conversation(db, user, guest, listing, count):
+    sent_at = datetime(2026, 3, 1, 12, 0)
+    messages = []
+    for i in range(count):
+        sender, receiver = (guest, user) if i % 2 == 0 else (user, guest)
+        messages.append(Message(
+            sender_id=sender.id, receiver_id=receiver.id, listing_id=listing.id, content=f"hi {i}",
+            timestamp=sent_at + timedelta(seconds=i),
+        ))
+    db.add_all(messages)
+    db.commit()
+    return messages
+
+
+def test_conversation_pages_back_through_both_directions(client, db, user, make_listings):
+    listing = make_listings(1)[0]
+    guest = User(email=f"{uuid.uuid4()}@example.com")
+    db.add(guest)
+    db.flush()
+    messages = _conversation(db, user, guest, listing, 7)
+
+    url = f"/api/v1/messages/conversation/{listing.id}/{user.id}/{guest.id}"
+    pages = []
+    params = {"limit": 3}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200, response.text
+        if not response.json():
+            break
+        pages.append([message["id"] for message in response.json()])
+        params["before"] = response.headers["X-Before-Cursor"]
+    assert pages == [
+        [str(m.id) for m in messages[4:]], [str(m.id) for m in messages[1:4]], [str(messages[0].id)]
+    ]
+
+    after = client.get(url, params={"limit": 2, "after": client.get(url, params={"limit": 7}).headers["X-Before-Cursor"]})
+    assert [message["id"] for message in after.json()] == [str(m.id) for m in messages[1:3]]
+
+
+def test_user_messages_newest_first_without_duplicating_notes_to_self(client, db, user, make_listings):
+    listing = make_listings(1)[0]
+    guest = User(email=f"{uuid.uuid4()}@example.com")
+    db.add(guest)
+    db.flush()
+    messages = _conversation(db, user, guest, listing, 4)
+    note = Message(
+        sender_id=user.id, receiver_id=user.id, listing_id=listing.id, content="note",
+        timestamp=datetime(2026, 3, 1, 13, 0),
+    )
+    db.add(note)
+    db.commit()
+
+    response = client.get(f"/api/v1/messages/user/{user.id}", params={"limit": 4})
+    assert [message["id"] for message in response.json()] == [str(m.id) for m in [note, *reversed(messages[1:])]]
+
+
+@pytest.mark.postgres_only
+def test_conversation_page_walks_each_direction_in_index_order(db, user, make_listings):
+    # Each direction must be an ordered index scan cut off by its own LIMIT
+    # rather than a BitmapOr over the whole history followed by a sort
+    listing = make_listings(1)[0]
+    guest = User(email=f"{uuid.uuid4()}@example.com")
+    db.add(guest)
+    db.flush()
+    _conversation(db, user, guest, listing, 20)
+    db.execute(text("ANALYZE messages"))
+    db.commit()
+
+    statements = []
+    listen = lambda conn, cursor, statement, parameters, context, executemany: statements.append((statement, parameters))
+    event.listen(db.bind, "before_cursor_execute", listen)
+    try:
+        get_conversation(listing.id, user.id, guest.id, None, None, 5, db)
+    finally:
+        event.remove(db.bind, "before_cursor_execute", listen)
+    statement, parameters = statements[-1]
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(row[0] for row in db.connection().exec_driver_sql(f"EXPLAIN {statement}", parameters))
+    assert "BitmapOr" not in plan
+    # Partition indexes are named after their columns, not after the parent's
+    assert plan.count("Index Scan Backward") >= 2
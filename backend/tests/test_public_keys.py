@@ -0,0 +1,36 @@
+import uuid
+
+from app.models.user import User
+
+
+def test_bulk_lookup_get_revalidates_until_a_key_rotates(client, db, user):
+    other = User(email=f"{uuid.uuid4()}@example.com")
+    db.add(other)
+    db.commit()
+    nobody = uuid.uuid4()
+    for owner, key in ((user, "key-a"), (other, "key-b")):
+        assert client.post("/api/v1/keys/upload", json={"user_id": str(owner.id), "public_key": key}).status_code == 200
+
+    url = "/api/v1/keys/lookup"
+    params = {"user_ids": [str(other.id), str(user.id), str(nobody)]}
+    first = client.get(url, params=params)
+    assert first.status_code == 200, first.text
+    body = first.json()
+    assert [key["user_id"] for key in body["keys"]] == [str(other.id), str(user.id)]
+    assert body["missing"] == [str(nobody)]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    etag = first.headers["ETag"]
+    assert client.get(url, params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/api/v1/keys/upload", json={"user_id": str(user.id), "public_key": "key-a2"})
+    rotated = client.get(url, params=params, headers={"If-None-Match": etag})
+    assert rotated.status_code == 200
+    assert rotated.headers["ETag"] != etag
+
+
+def test_bulk_lookup_get_limits_the_id_count(client):
+    response = client.get(
+        "/api/v1/keys/lookup", params={"user_ids": [str(uuid.uuid4()) for _ in range(201)]}
+    )
+    assert response.status_code == 422
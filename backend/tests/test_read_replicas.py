@@ -0,0 +1,72 @@
+import time
+import uuid
+
+import pytest
+
+from app.core import database
+from app.core.cache import recent_writes
+from app.models.user import User
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """
+    A caught-up replica that is really the test database, recording which
+    session factory each read used
+    """
+    replica = database.Replica("replica1", database.engine.url.render_as_string(hide_password=False))
+    replica.lag_seconds, replica.checked_at = 0.0, time.monotonic()
+    replica.reads = []
+    sync_factory, async_factory = replica.SessionLocal, replica.AsyncSessionLocal
+    replica.SessionLocal = lambda: replica.reads.append("sync") or sync_factory()
+    replica.AsyncSessionLocal = lambda: replica.reads.append("async") or async_factory()
+    monkeypatch.setattr(database.replica_router, "replicas", [replica])
+    monkeypatch.setattr(database.settings, "DB_REPLICA_LAG_CHECK_SECONDS", 3600.0)
+    recent_writes.clear()
+    yield replica
+    recent_writes.clear()
+    replica.engine.dispose()
+
+
+def test_reads_use_a_caught_up_replica(client, replica, user):
+    assert client.get(f"/api/v1/messages/conversations/{user.id}").status_code == 200
+    assert client.get("/api/v1/listings/").status_code == 200
+    assert replica.reads == ["sync", "async"]
+
+
+def test_lagging_replica_falls_back_to_primary(client, replica, user):
+    replica.lag_seconds = database.settings.DB_REPLICA_MAX_LAG_SECONDS + 1
+    assert client.get(f"/api/v1/messages/conversations/{user.id}").status_code == 200
+    assert replica.reads == []
+
+
+def test_sender_reads_own_inbox_from_primary_after_sending(client, replica, db, user, make_listings):
+    listing = make_listings(1)[0]
+    sender_id, bystander_id = uuid.uuid4(), uuid.uuid4()
+    db.add_all([User(id=user_id, email=f"{user_id}@example.com") for user_id in (sender_id, bystander_id)])
+    db.commit()
+    response = client.post("/api/v1/messages/", json={
+        "sender_id": str(sender_id), "receiver_id": str(user.id), "listing_id": str(listing.id), "content": "Still available?",
+    })
+    assert response.status_code == 200, response.text
+
+    client.get(f"/api/v1/messages/conversations/{sender_id}")
+    client.get(f"/api/v1/messages/conversations/{user.id}")
+    assert replica.reads == []
+    client.get(f"/api/v1/messages/conversations/{bystander_id}")
+    assert replica.reads == ["sync"]
+
+
+def test_authenticated_writer_reads_own_listings_from_primary(client, replica, auth_headers):
+    response = client.post("/api/v1/listings/create", headers=auth_headers, json={
+        "title": "Loft", "description": "Bright", "price": 1200, "address": "2 Main St", "city": "Madison",
+        "state": "WI", "property_type": "Loft", "bedrooms": 1, "bathrooms": 1,
+        "available_from": "2026-05-01T00:00:00.000Z", "available_to": "2026-08-31T00:00:00.000Z",
+    })
+    assert response.status_code == 200, response.text
+
+    client.get("/api/v1/listings/my", headers=auth_headers)
+    client.get(f"/api/v1/listings/{response.json()['id']}")
+    assert replica.reads == []
+    client.get("/api/v1/listings/")
+    assert replica.reads == ["async"]
@@ -122,20 +122,32 @@ export const messagesService = {
 
       const [listingId, otherUserId] = conversationId.split("_");
 
-      const response = await fetch(
-        `${API_BASE_URL}/messages/conversation/${listingId}/${currentUser.id}/${otherUserId}`,
-        {
+      // The endpoint returns the latest page; follow X-Before-Cursor back
+      // through older pages so the whole conversation is shown
+      const url = `${API_BASE_URL}/messages/conversation/${listingId}/${currentUser.id}/${otherUserId}`;
+      let messages: unknown[] = [];
+      let before: string | null = null;
+      do {
+        const params = new URLSearchParams({ limit: "200" });
+        if (before) {
+          params.set("before", before);
+        }
+        const response = await fetch(`${url}?${params}`, {
           headers: {
             Authorization: `Bearer ${token}`,
           },
+        });
+
+        if (!response.ok) {
+          throw new Error("Failed to fetch messages");
         }
-      );
 
-      if (!response.ok) {
-        throw new Error("Failed to fetch messages");
-      }
+        const page = await response.json();
+        messages = [...page, ...messages];
+        before = page.length === 200 ? response.headers.get("X-Before-Cursor") : null;
+      } while (before);
 
-      return { success: true, data: await response.json() };
+      return { success: true, data: messages };
     } catch (error: unknown) {
       if (error instanceof Error) {
         return { success: false, error: error.message };